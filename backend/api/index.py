@@ -1,11 +1,11 @@
 """Vercel serverless entry point."""
 
+import os
 import sys
-from pathlib import Path
 
 # Add backend to path
-backend_path = Path(__file__).resolve().parent.parent
-sys.path.insert(0, str(backend_path))
+backend_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_path)
 
 from app.main import app
 
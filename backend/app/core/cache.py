@@ -0,0 +1,86 @@
+"""In-process response cache for read-heavy endpoints."""
+
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+from app.core.config import settings
+
+
+class ResponseCache:
+    """Per-user TTL cache for computed API responses.
+
+    Entries are grouped by user so that any write to a user's data can drop
+    everything cached for them in one call.
+    """
+
+    def __init__(self, ttl: float, max_users: int = 4096, max_entries_per_user: int = 64):
+        self.ttl = ttl
+        self.max_users = max_users
+        self.max_entries_per_user = max_entries_per_user
+        self._entries: dict[int, dict[Hashable, tuple[float, Any]]] = {}
+        # Bumped by invalidate()/clear() so a value computed across a write is
+        # not stored after the write dropped the user's entries
+        self._generations: dict[int, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def get_or_set(
+        self,
+        user_id: int,
+        key: Hashable,
+        factory: Callable[[], Any],
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Return the cached value for (user_id, key), computing it on a miss.
+
+        A computed value is only stored when ``cacheable`` (if given) accepts it.
+        """
+        if self.ttl <= 0:
+            return factory()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id, {}).get(key)
+            generation = (self._epoch, self._generations.get(user_id, 0))
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        value = factory()
+        if cacheable is not None and not cacheable(value):
+            return value
+        with self._lock:
+            if generation != (self._epoch, self._generations.get(user_id, 0)):
+                return value  # Invalidated while computing; may predate the write
+            user_entries = self._entries.get(user_id)
+            if user_entries is None:
+                if len(self._entries) >= self.max_users:
+                    self._entries.pop(next(iter(self._entries)))
+                user_entries = self._entries[user_id] = {}
+            elif key not in user_entries and len(user_entries) >= self.max_entries_per_user:
+                user_entries.pop(next(iter(user_entries)))
+            user_entries[key] = (now + self.ttl, value)
+        return value
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop all cached responses for a user."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+
+response_cache = ResponseCache(ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
+
+# Parsed and validated CSV uploads, so an import reuses its preview's work.
+# Kept small: entries hold every row (about 1.5 KB each once validated), and
+# ImportService only stores uploads up to IMPORT_CACHE_MAX_ROWS
+import_cache = ResponseCache(
+    ttl=settings.IMPORT_CACHE_TTL_SECONDS, max_users=32, max_entries_per_user=2
+)
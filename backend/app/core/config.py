@@ -15,15 +15,29 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./expenses.db"
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    DB_POOL_RECYCLE: int = 3600  # Seconds before a pooled connection is replaced
+    CREATE_TABLES_ON_STARTUP: bool = True  # Disable once the schema exists (serverless cold starts)
     
     # Security
     SECRET_KEY: str = "change-this-in-production-use-openssl-rand-hex-32"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    BCRYPT_ROUNDS: int = 12  # Work factor for new hashes; existing hashes carry their own
     
     # CORS
     CORS_ORIGINS: list[str] = ["*"]
+    # Auth uses bearer headers, not cookies; only enable with explicit origins
+    CORS_ALLOW_CREDENTIALS: bool = False
+    
+    # Caching
+    # In-process and invalidated only in the process that handled the write, so
+    # opt-in (e.g. 60) only for single-process deployments; 0 disables it
+    RESPONSE_CACHE_TTL_SECONDS: int = 0
+    IMPORT_CACHE_TTL_SECONDS: int = 300  # Keeps a previewed CSV's parse for the import that follows
+    IMPORT_CACHE_MAX_ROWS: int = 2000  # Larger uploads are parsed per request, never held in memory
     
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
@@ -8,6 +8,11 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.core.security import decode_token
 from app.models.user import User
+from app.services.budget_service import BudgetService
+from app.services.expense_service import ExpenseService
+from app.services.import_service import ImportService
+from app.services.recurring_service import RecurringExpenseService
+from app.services.user_service import UserService
 
 # Security scheme
 security = HTTPBearer()
@@ -37,7 +42,8 @@ async def get_current_user(
     if user_id is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    # Primary-key lookup goes through the session identity map first
+    user = db.get(User, int(user_id))
     if user is None:
         raise credentials_exception
     
@@ -69,3 +75,34 @@ CurrentUser = Annotated[User, Depends(get_current_user)]
 OptionalUser = Annotated[Optional[User], Depends(get_current_user_optional)]
 DatabaseSession = Annotated[Session, Depends(get_db)]
 
+
+def get_expense_service(db: DatabaseSession) -> ExpenseService:
+    """Dependency for ExpenseService."""
+    return ExpenseService(db)
+
+
+def get_import_service(db: DatabaseSession) -> ImportService:
+    """Dependency for ImportService."""
+    return ImportService(db)
+
+
+def get_budget_service(db: DatabaseSession) -> BudgetService:
+    """Dependency for BudgetService."""
+    return BudgetService(db)
+
+
+def get_recurring_service(db: DatabaseSession) -> RecurringExpenseService:
+    """Dependency for RecurringExpenseService."""
+    return RecurringExpenseService(db)
+
+
+def get_user_service(db: DatabaseSession) -> UserService:
+    """Dependency for UserService."""
+    return UserService(db)
+
+
+ExpenseServiceDep = Annotated[ExpenseService, Depends(get_expense_service)]
+ImportServiceDep = Annotated[ImportService, Depends(get_import_service)]
+BudgetServiceDep = Annotated[BudgetService, Depends(get_budget_service)]
+RecurringServiceDep = Annotated[RecurringExpenseService, Depends(get_recurring_service)]
+UserServiceDep = Annotated[UserService, Depends(get_user_service)]
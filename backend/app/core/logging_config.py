@@ -35,6 +35,8 @@ class JSONFormatter(logging.Formatter):
             log_data["method"] = record.method
         if hasattr(record, "path"):
             log_data["path"] = record.path
+        if hasattr(record, "client_ip"):
+            log_data["client_ip"] = record.client_ip
         if hasattr(record, "status_code"):
             log_data["status_code"] = record.status_code
         if hasattr(record, "duration_ms"):
@@ -1,25 +1,67 @@
 """Database configuration and session management."""
 
-from sqlalchemy import create_engine
+from sqlalchemy import DateTime, create_engine
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from app.core.config import settings
 
 # Handle SQLite specific settings
 connect_args = {}
+pool_args = {}
 if settings.DATABASE_URL.startswith("sqlite"):
     connect_args["check_same_thread"] = False
+else:
+    # Size the pool for the threadpool running sync routes so concurrent
+    # requests don't queue behind the default 5 + 10 connections
+    pool_args = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_use_lifo": True,  # Reuse hot connections, let idle ones expire
+    }
 
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args=connect_args,
     pool_pre_ping=True,  # Verify connections before using
+    **pool_args,
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+class utcnow(FunctionElement):
+    """Current UTC time as a naive timestamp, computed by the database.
+
+    Timestamp columns are naive DateTime holding UTC (as datetime.utcnow did);
+    PostgreSQL's now() would follow the session time zone instead.
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is already UTC
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _utcnow_postgresql(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+# Dialect-specific inserts that support ON CONFLICT, keyed by dialect name
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
 
 def get_db():
     """Dependency for database session."""
@@ -30,6 +72,26 @@ def get_db():
         db.close()
 
 
-def create_tables():
-    """Create all database tables."""
-    Base.metadata.create_all(bind=engine)
+# Idempotent DDL for databases created before a schema change. create_all only
+# creates missing tables, it never alters existing ones.
+SCHEMA_UPGRADES = (
+    # Idempotency keys are unique per user, not globally; expense creation's
+    # ON CONFLICT (user_id, idempotency_key) needs this index to exist
+    (
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_expenses_user_idempotency_key "
+        "ON expenses (user_id, idempotency_key)"
+    ),
+    "DROP INDEX IF EXISTS ix_expenses_idempotency_key",
+    # (user_id, next_run_date) is the one recurring index; every query filters on user_id
+    "DROP INDEX IF EXISTS ix_recurring_expenses_next_run_date",
+    "DROP INDEX IF EXISTS ix_recurring_user_active_next_run",
+)
+
+
+def create_tables(bind=None):
+    """Create all database tables and apply pending schema upgrades."""
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        for statement in SCHEMA_UPGRADES:
+            conn.exec_driver_sql(statement)
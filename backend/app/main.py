@@ -1,10 +1,10 @@
 """FastAPI application entry point."""
 
+import json
 import os
 from contextlib import asynccontextmanager
-from pathlib import Path
-
-from fastapi import FastAPI, Request, status
+import jinja2
+from fastapi import FastAPI, Request, Response, status
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
@@ -13,28 +13,42 @@ from fastapi.exceptions import RequestValidationError
 
 from app.core.config import settings
 from app.core.logging_config import setup_logging, get_logger
-from app.database import create_tables
+from app.database import create_tables, engine
 from app.routers import auth_router, expenses_router, users_router, budgets_router, recurring_router
 from app.middleware.logging_middleware import RequestLoggingMiddleware
+from app.middleware.health_middleware import HealthCheckMiddleware
 
 # Setup logging
 JSON_LOGS = os.getenv("JSON_LOGS", "false").lower() == "true"
 setup_logging(debug=settings.DEBUG, json_logs=JSON_LOGS)
 logger = get_logger("main")
 
-# Get the backend directory path
-BASE_DIR = Path(__file__).resolve().parent.parent
+# Get the backend directory path (abspath avoids resolve()'s realpath syscalls on cold start)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Settings are fixed for the process lifetime, so the payload is encoded once
+HEALTH_STATUS = json.dumps({
+    "status": "healthy",
+    "app": settings.APP_NAME,
+    "version": settings.APP_VERSION,
+    "environment": "development" if settings.DEBUG else "production"
+}).encode()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
-    logger.info(f"🚀 Starting {settings.APP_NAME} v{settings.APP_VERSION}")
-    logger.info(f"   Environment: {'Development' if settings.DEBUG else 'Production'}")
-    logger.info(f"   Database: {settings.DATABASE_URL[:50]}...")
-    create_tables()
-    logger.info("✅ Database tables created/verified")
+    logger.info(
+        "🚀 Starting %s v%s | Environment: %s | Database: %s",
+        settings.APP_NAME,
+        settings.APP_VERSION,
+        "Development" if settings.DEBUG else "Production",
+        engine.url.render_as_string(hide_password=True),
+    )
+    if settings.CREATE_TABLES_ON_STARTUP:
+        create_tables()
+        logger.info("✅ Database tables created/verified")
     yield
     # Shutdown
     logger.info("👋 Shutting down application")
@@ -56,15 +70,16 @@ app.add_middleware(RequestLoggingMiddleware)
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle validation errors with better formatting."""
-    logger.warning(f"Validation error on {request.url.path}: {exc.errors()}")
-    errors = []
-    for error in exc.errors():
-        field = ".".join(str(loc) for loc in error["loc"])
-        errors.append({
-            "field": field,
+    raw_errors = exc.errors()
+    logger.warning("Validation error on %s: %s", request.url.path, raw_errors)
+    errors = [
+        {
+            "field": ".".join(map(str, error["loc"])),
             "message": error["msg"],
             "type": error["type"]
-        })
+        }
+        for error in raw_errors
+    ]
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={"detail": "Validation error", "errors": errors}
@@ -81,20 +96,30 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
-# Configure CORS
+# Configure CORS; without credentials a wildcard origin is sent as a static
+# "*" instead of echoing and re-validating the Origin on every response
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
+    allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Answer health probes ahead of CORS and logging (added last, so outermost)
+app.add_middleware(HealthCheckMiddleware, path="/health", body=HEALTH_STATUS)
+
 # Mount static files
-app.mount("/static", StaticFiles(directory=BASE_DIR / "static"), name="static")
+app.mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), name="static")
 
-# Setup templates
-templates = Jinja2Templates(directory=BASE_DIR / "templates")
+# Setup templates; auto-reload (a stat() per render) only in development
+templates = Jinja2Templates(env=jinja2.Environment(
+    loader=jinja2.FileSystemLoader(os.path.join(BASE_DIR, "templates")),
+    autoescape=jinja2.select_autoescape(),
+    auto_reload=settings.DEBUG,
+))
+# Compile the landing page at import so a cold start's first request doesn't pay for it
+templates.get_template("index.html")
 
 # Include API routers
 app.include_router(auth_router)
@@ -107,15 +132,10 @@ app.include_router(recurring_router)
 @app.get("/", include_in_schema=False)
 async def index(request: Request):
     """Serve the main frontend page."""
-    return templates.TemplateResponse("index.html", {"request": request})
+    return templates.TemplateResponse(request, "index.html")
 
 
 @app.get("/health", tags=["health"])
-def health_check():
-    """Health check endpoint for monitoring."""
-    return {
-        "status": "healthy",
-        "app": settings.APP_NAME,
-        "version": settings.APP_VERSION,
-        "environment": "development" if settings.DEBUG else "production"
-    }
+def health_check() -> Response:
+    """Health check endpoint for monitoring (GET is served by HealthCheckMiddleware)."""
+    return Response(content=HEALTH_STATUS, media_type="application/json")
@@ -1,79 +1,107 @@
 """Request/Response logging middleware."""
 
+import logging
+import re
+import secrets
 import time
-import uuid
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.logging_config import get_logger
 
 logger = get_logger("middleware")
 
+# Upstream request IDs are reused only if they are short and log-safe
+_UPSTREAM_REQUEST_ID = re.compile(rb"[A-Za-z0-9._-]{1,64}")
+
+
+def get_request_id(scope: Scope) -> str:
+    """Reuse a valid upstream X-Request-ID header or generate a short random one."""
+    for name, value in scope["headers"]:
+        if name == b"x-request-id":
+            if _UPSTREAM_REQUEST_ID.fullmatch(value):
+                return value.decode("ascii")
+            break
+    return secrets.token_hex(4)
+
+
+class RequestLoggingMiddleware:
+    """Pure ASGI middleware to log all requests and responses."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Resolve request ID and expose it via request.state
+        request_id = get_request_id(scope)
+        scope.setdefault("state", {})["request_id"] = request_id
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log all requests and responses."""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Generate request ID
-        request_id = str(uuid.uuid4())[:8]
-        request.state.request_id = request_id
-        
         # Start timer
-        start_time = time.time()
-        
-        # Get request info
-        method = request.method
-        path = request.url.path
-        client_ip = request.client.host if request.client else "unknown"
-        
-        # Log request
-        logger.info(
-            f"[{request_id}] {method} {path} - Started",
-            extra={
-                "request_id": request_id,
-                "method": method,
-                "path": path,
-                "client_ip": client_ip
-            }
-        )
-        
-        # Process request
-        try:
-            response = await call_next(request)
-            
-            # Calculate duration
-            duration_ms = round((time.time() - start_time) * 1000, 2)
-            
-            # Log response
-            log_method = logger.info if response.status_code < 400 else logger.warning
-            log_method(
-                f"[{request_id}] {method} {path} - {response.status_code} ({duration_ms}ms)",
+        start_time = time.perf_counter()
+
+        # Get request info straight from the scope
+        method = scope["method"]
+        path = scope["path"]
+
+        # Log request; skip building the record when INFO is filtered out
+        if logger.isEnabledFor(logging.INFO):
+            client = scope.get("client")
+            logger.info(
+                "[%s] %s %s - Started", request_id, method, path,
                 extra={
                     "request_id": request_id,
                     "method": method,
                     "path": path,
-                    "status_code": response.status_code,
-                    "duration_ms": duration_ms
+                    "client_ip": client[0] if client else "unknown"
                 }
             )
-            
-            # Add request ID to response headers
-            response.headers["X-Request-ID"] = request_id
-            
-            return response
-            
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Add request ID to response headers
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Log response with its duration
+                level = logging.INFO if status_code < 400 else logging.WARNING
+                if logger.isEnabledFor(level):
+                    duration_ms = (time.perf_counter() - start_time) * 1000
+                    logger.log(
+                        level, "[%s] %s %s - %d (%.2fms)",
+                        request_id, method, path, status_code, duration_ms,
+                        extra={
+                            "request_id": request_id,
+                            "method": method,
+                            "path": path,
+                            "status_code": status_code,
+                            "duration_ms": round(duration_ms, 2)
+                        }
+                    )
+
+            await send(message)
+
+        # Process request
+        try:
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            duration_ms = round((time.time() - start_time) * 1000, 2)
+            duration_ms = (time.perf_counter() - start_time) * 1000
             logger.error(
-                f"[{request_id}] {method} {path} - Error: {str(e)} ({duration_ms}ms)",
+                "[%s] %s %s - Error: %s (%.2fms)", request_id, method, path, e, duration_ms,
                 extra={
                     "request_id": request_id,
                     "method": method,
                     "path": path,
-                    "duration_ms": duration_ms
+                    "duration_ms": round(duration_ms, 2)
                 },
                 exc_info=True
             )
             raise
-
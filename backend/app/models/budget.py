@@ -1,25 +1,26 @@
 """Budget database model."""
 
-from datetime import datetime
 from decimal import Decimal
 from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 
-from app.database import Base
+from app.database import Base, utcnow
 
 
 class Budget(Base):
     """Budget limit model for tracking spending limits per category."""
     
     __tablename__ = "budgets"
+    # Read the database-generated timestamps back via RETURNING, not a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     category = Column(String(100), nullable=False)
     monthly_limit = Column(Numeric(precision=12, scale=2), nullable=False)
     alert_threshold = Column(Integer, default=80)  # Alert when spending reaches this % of limit
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=utcnow(), nullable=False)
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="budgets")
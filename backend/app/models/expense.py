@@ -1,29 +1,32 @@
 """Expense database model."""
 
-from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, Index, ForeignKey, Text, JSON
+from sqlalchemy import (
+    DDL, Column, Integer, String, DateTime, Numeric, Index, ForeignKey, Text, JSON, event
+)
 from sqlalchemy.orm import relationship
 
-from app.database import Base
+from app.database import Base, utcnow
 
 
 class Expense(Base):
     """Expense record model."""
     
     __tablename__ = "expenses"
+    # Read the database-generated timestamps back via RETURNING, not a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     amount = Column(Numeric(precision=12, scale=2), nullable=False)
     category = Column(String(100), nullable=False, index=True)
     description = Column(Text, nullable=False)
     date = Column(DateTime, nullable=False, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=utcnow(), nullable=False)
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow(), nullable=False)
     
     # Idempotency key to prevent duplicate entries on retries
-    idempotency_key = Column(String(64), unique=True, nullable=True, index=True)
+    idempotency_key = Column(String(64), nullable=True)
     
     # Currency support (feature 5)
     currency = Column(String(3), default="INR", nullable=False)
@@ -44,9 +47,28 @@ class Expense(Base):
     user = relationship("User", back_populates="expenses")
 
     __table_args__ = (
-        Index('ix_expenses_user_category', 'user_id', 'category'),
+        # Also serves (user_id, category) lookups; date lets per-month category
+        # sums for budgets range-scan within a category
+        Index('ix_expenses_user_category_date', 'user_id', 'category', 'date'),
         Index('ix_expenses_user_date', 'user_id', 'date'),
+        # Keys are scoped per user and back create()'s ON CONFLICT target. A named
+        # unique index (not a constraint) so create_tables() can add it to older
+        # databases with CREATE UNIQUE INDEX IF NOT EXISTS
+        Index('uq_expenses_user_idempotency_key', 'user_id', 'idempotency_key', unique=True),
+        # Lets PostgreSQL serve the description ILIKE '%term%' search from an index
+        Index(
+            'ix_expenses_description_trgm', 'description',
+            postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'}
+        ).ddl_if(dialect='postgresql'),
     )
 
     def __repr__(self):
         return f"<Expense(id={self.id}, amount={self.amount}, category={self.category})>"
+
+
+# The trigram operator class comes from the pg_trgm extension
+event.listen(
+    Expense.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
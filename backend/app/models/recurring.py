@@ -1,20 +1,21 @@
 """Recurring expense database model."""
 
-from datetime import datetime, date
 from decimal import Decimal
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey, Boolean, Date
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey, Boolean, Date, Index
 from sqlalchemy.orm import relationship
 
-from app.database import Base
+from app.database import Base, utcnow
 
 
 class RecurringExpense(Base):
     """Recurring expense template for auto-creating expenses."""
     
     __tablename__ = "recurring_expenses"
+    # Read the database-generated timestamps back via RETURNING, not a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Expense details
     amount = Column(Numeric(precision=12, scale=2), nullable=False)
@@ -30,19 +31,24 @@ class RecurringExpense(Base):
     # Schedule
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=True)  # null = no end
-    next_run_date = Column(Date, nullable=False, index=True)
+    next_run_date = Column(Date, nullable=False)
     last_run_date = Column(Date, nullable=True)
     
     # Status
     is_active = Column(Boolean, default=True, nullable=False)
     times_executed = Column(Integer, default=0)
     
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, server_default=utcnow(), nullable=False)
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="recurring_expenses")
 
+    __table_args__ = (
+        # Serves both list_recurring's filter and sort and the due-template scan
+        Index('ix_recurring_user_next_run', 'user_id', 'next_run_date'),
+    )
+
     def __repr__(self):
         return f"<RecurringExpense(id={self.id}, desc={self.description}, freq={self.frequency})>"
 
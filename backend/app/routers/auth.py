@@ -1,11 +1,9 @@
 """Authentication API routes."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, status
 
-from app.database import get_db
 from app.schemas.user import UserCreate, UserResponse, Token, LoginRequest
-from app.services.user_service import UserService
+from app.core.dependencies import UserServiceDep
 from app.core.security import create_access_token, create_refresh_token, decode_token
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
@@ -19,7 +17,7 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 )
 def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    user_service: UserServiceDep
 ) -> UserResponse:
     """
     Register a new user account.
@@ -29,17 +27,19 @@ def register(
     - **password**: Min 8 chars, must include uppercase, lowercase, and digit
     - **full_name**: Optional display name
     """
-    user_service = UserService(db)
-    
+    email_taken, username_taken = user_service.exists_email_or_username(
+        user_data.email, user_data.username
+    )
+
     # Check if email is taken
-    if user_service.is_email_taken(user_data.email):
+    if email_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     # Check if username is taken
-    if user_service.is_username_taken(user_data.username):
+    if username_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
@@ -56,7 +56,7 @@ def register(
 )
 def login(
     login_data: LoginRequest,
-    db: Session = Depends(get_db)
+    user_service: UserServiceDep
 ) -> Token:
     """
     Authenticate user and return JWT tokens.
@@ -64,7 +64,6 @@ def login(
     - **username**: Username or email
     - **password**: User password
     """
-    user_service = UserService(db)
     user = user_service.authenticate(login_data.username, login_data.password)
     
     if not user:
@@ -96,7 +95,7 @@ def login(
 )
 def refresh_token(
     refresh_token: str,
-    db: Session = Depends(get_db)
+    user_service: UserServiceDep
 ) -> Token:
     """
     Get a new access token using a refresh token.
@@ -117,7 +116,6 @@ def refresh_token(
             detail="Invalid refresh token"
         )
     
-    user_service = UserService(db)
     user = user_service.get_by_id(int(user_id))
     
     if user is None or not user.is_active:
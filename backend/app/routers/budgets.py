@@ -1,19 +1,21 @@
 """Budget API routes."""
 
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Response, status
+from pydantic import TypeAdapter
 
-from app.database import get_db
 from app.schemas.budget import (
     BudgetCreate, BudgetUpdate, BudgetResponse,
     BudgetStatus, BudgetOverview
 )
-from app.services.budget_service import BudgetService
-from app.core.dependencies import CurrentUser
+from app.core.cache import response_cache
+from app.core.dependencies import BudgetServiceDep, CurrentUser
 
 router = APIRouter(prefix="/budgets", tags=["budgets"])
 
+# Validates ORM rows and dumps the whole list to JSON in one pass
+_budget_list_adapter = TypeAdapter(List[BudgetResponse])
+
 
 @router.post(
     "",
@@ -24,10 +26,9 @@ router = APIRouter(prefix="/budgets", tags=["budgets"])
 def create_budget(
     budget_data: BudgetCreate,
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    budget_service: BudgetServiceDep
 ) -> BudgetResponse:
     """Create a new budget or update existing one for the category."""
-    budget_service = BudgetService(db)
     budget = budget_service.create(current_user, budget_data)
     return budget
 
@@ -39,11 +40,18 @@ def create_budget(
 )
 def list_budgets(
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
-) -> List[BudgetResponse]:
+    budget_service: BudgetServiceDep
+) -> Response:
     """List all budgets for the authenticated user."""
-    budget_service = BudgetService(db)
-    return budget_service.list_budgets(current_user.id)
+
+    def load_budgets_json() -> bytes:
+        budgets = _budget_list_adapter.validate_python(
+            budget_service.list_budgets(current_user.id), from_attributes=True
+        )
+        return _budget_list_adapter.dump_json(budgets)
+
+    content = response_cache.get_or_set(current_user.id, "budgets", load_budgets_json)
+    return Response(content=content, media_type="application/json")
 
 
 @router.get(
@@ -53,11 +61,13 @@ def list_budgets(
 )
 def get_budget_overview(
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    budget_service: BudgetServiceDep
 ) -> BudgetOverview:
     """Get overview of all budgets with current status and alerts."""
-    budget_service = BudgetService(db)
-    return budget_service.get_budget_overview(current_user.id)
+    return response_cache.get_or_set(
+        current_user.id, "budgets_overview",
+        lambda: budget_service.get_budget_overview(current_user.id)
+    )
 
 
 @router.get(
@@ -68,19 +78,22 @@ def get_budget_overview(
 def get_budget_status(
     budget_id: int,
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    budget_service: BudgetServiceDep
 ) -> BudgetStatus:
     """Get status of a specific budget including current spending."""
-    budget_service = BudgetService(db)
-    budget = budget_service.get_by_id(budget_id, current_user.id)
-    
-    if not budget:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Budget with id {budget_id} not found"
-        )
-    
-    return budget_service.get_budget_status(budget)
+
+    def load_status() -> BudgetStatus:
+        budget = budget_service.get_by_id(budget_id, current_user.id)
+        
+        if not budget:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Budget with id {budget_id} not found"
+            )
+        
+        return budget_service.get_budget_status(budget)
+
+    return response_cache.get_or_set(current_user.id, ("budget_status", budget_id), load_status)
 
 
 @router.patch(
@@ -92,10 +105,9 @@ def update_budget(
     budget_id: int,
     budget_data: BudgetUpdate,
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    budget_service: BudgetServiceDep
 ) -> BudgetResponse:
     """Update an existing budget."""
-    budget_service = BudgetService(db)
     budget = budget_service.get_by_id(budget_id, current_user.id)
     
     if not budget:
@@ -115,10 +127,9 @@ def update_budget(
 def delete_budget(
     budget_id: int,
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    budget_service: BudgetServiceDep
 ) -> None:
     """Delete a budget."""
-    budget_service = BudgetService(db)
     budget = budget_service.get_by_id(budget_id, current_user.id)
     
     if not budget:
@@ -1,15 +1,12 @@
 """Expense API routes."""
 
-import csv
-import io
+import zlib
 from datetime import date
 from decimal import Decimal
 from typing import Optional, Literal
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi import APIRouter, HTTPException, Request, status, Query, UploadFile, File
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
 
-from app.database import get_db
 from app.schemas.expense import (
     ExpenseCreate, 
     ExpenseUpdate, 
@@ -20,12 +17,50 @@ from app.schemas.expense import (
     AnalyticsResponse
 )
 from app.schemas.import_export import ImportResult, ImportPreview
-from app.services.expense_service import ExpenseService
-from app.services.import_service import ImportService
-from app.core.dependencies import CurrentUser
+from app.core.cache import response_cache
+from app.core.dependencies import CurrentUser, ExpenseServiceDep, ImportServiceDep
+from app.services.expense_service import InvalidCursorError
 
 router = APIRouter(prefix="/expenses", tags=["expenses"])
 
+_CSV_HEADER = b"Date,Category,Description,Amount\r\n"
+_CSV_ROWS_PER_CHUNK = 500
+
+
+def _csv_field(value: str) -> str:
+    """Quote a CSV field the way csv.writer's default dialect does."""
+    if '"' in value or "," in value or "\n" in value or "\r" in value:
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows a gzip response."""
+    qualities = {}
+    for coding in accept_encoding.lower().split(","):
+        name, _, params = coding.partition(";")
+        name = name.strip()
+        if name not in ("gzip", "*"):
+            continue
+        _, _, quality = params.partition("q=")
+        try:
+            qualities[name] = float(quality or 1)
+        except ValueError:
+            qualities[name] = 0.0
+    # An explicit gzip entry overrides the wildcard, wherever each appears
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def _gzip_chunks(chunks):
+    """Compress a byte stream as gzip, emitting output per input chunk."""
+    # Level 1 keeps CPU low while still collapsing the repetitive columns
+    compressor = zlib.compressobj(1, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
 
 @router.post(
     "",
@@ -36,7 +71,7 @@ router = APIRouter(prefix="/expenses", tags=["expenses"])
 def create_expense(
     expense_data: ExpenseCreate,
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    expense_service: ExpenseServiceDep
 ) -> ExpenseResponse:
     """
     Create a new expense for the authenticated user.
@@ -44,7 +79,6 @@ def create_expense(
     Supports idempotency via `idempotency_key` - if a request is retried with
     the same key, the existing expense is returned instead of creating a duplicate.
     """
-    expense_service = ExpenseService(db)
     expense = expense_service.create(current_user, expense_data)
     return expense
 
@@ -56,7 +90,7 @@ def create_expense(
 )
 def list_expenses(
     current_user: CurrentUser,
-    db: Session = Depends(get_db),
+    expense_service: ExpenseServiceDep,
     category: Optional[str] = Query(None, description="Filter by category"),
     start_date: Optional[date] = Query(None, description="Filter from date"),
     end_date: Optional[date] = Query(None, description="Filter to date"),
@@ -66,11 +100,15 @@ def list_expenses(
     sort: Optional[Literal["date_desc", "date_asc", "amount_desc", "amount_asc"]] = Query(
         None, description="Sort order"
     ),
-    page: int = Query(1, ge=1, description="Page number"),
-    page_size: int = Query(50, ge=1, le=100, description="Items per page")
+    page: int = Query(1, ge=1, description="Page number (prefer cursor for deep pages)"),
+    page_size: int = Query(50, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
 ) -> ExpenseListResponse:
     """
     List expenses for the authenticated user with filtering, sorting, and pagination.
+
+    Pass `next_cursor` back as `cursor` to fetch the following page without
+    an OFFSET scan; `page` remains available for jumping to a page.
     """
     filters = ExpenseFilters(
         category=category,
@@ -81,13 +119,19 @@ def list_expenses(
         search=search,
         sort=sort,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor
     )
     
-    expense_service = ExpenseService(db)
-    expenses, total_count, total_amount = expense_service.list_expenses(
-        current_user.id, filters
-    )
+    try:
+        expenses, total_count, total_amount, next_cursor = expense_service.list_expenses(
+            current_user.id, filters
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     total_pages = (total_count + page_size - 1) // page_size
     
@@ -97,7 +141,8 @@ def list_expenses(
         count=total_count,
         page=page,
         page_size=page_size,
-        total_pages=total_pages
+        total_pages=total_pages,
+        next_cursor=next_cursor
     )
 
 
@@ -108,12 +153,14 @@ def list_expenses(
 )
 def get_expense_summary(
     current_user: CurrentUser,
-    db: Session = Depends(get_db),
+    expense_service: ExpenseServiceDep,
     year: Optional[int] = Query(None, description="Filter by year")
 ) -> ExpenseSummary:
     """Get expense summary and analytics for the authenticated user."""
-    expense_service = ExpenseService(db)
-    return expense_service.get_summary(current_user.id, year)
+    return response_cache.get_or_set(
+        current_user.id, ("expense_summary", year),
+        lambda: expense_service.get_summary(current_user.id, year)
+    )
 
 
 @router.get(
@@ -123,7 +170,7 @@ def get_expense_summary(
 )
 def get_analytics(
     current_user: CurrentUser,
-    db: Session = Depends(get_db),
+    expense_service: ExpenseServiceDep,
     months: int = Query(12, ge=1, le=36, description="Number of months to analyze")
 ) -> AnalyticsResponse:
     """
@@ -133,8 +180,10 @@ def get_analytics(
     - Daily spending (last 30 days)
     - Month over month comparison
     """
-    expense_service = ExpenseService(db)
-    return expense_service.get_analytics(current_user.id, months)
+    return response_cache.get_or_set(
+        current_user.id, ("expense_analytics", months),
+        lambda: expense_service.get_analytics(current_user.id, months)
+    )
 
 
 @router.get(
@@ -144,11 +193,13 @@ def get_analytics(
 )
 def get_categories(
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    expense_service: ExpenseServiceDep
 ) -> list[str]:
     """Get list of categories used by the authenticated user."""
-    expense_service = ExpenseService(db)
-    return expense_service.get_categories(current_user.id)
+    return response_cache.get_or_set(
+        current_user.id, "expense_categories",
+        lambda: expense_service.get_categories(current_user.id)
+    )
 
 
 @router.get(
@@ -156,56 +207,49 @@ def get_categories(
     summary="Export expenses to CSV"
 )
 def export_expenses(
+    request: Request,
     current_user: CurrentUser,
-    db: Session = Depends(get_db),
+    expense_service: ExpenseServiceDep,
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     category: Optional[str] = Query(None)
 ) -> StreamingResponse:
     """Export expenses to CSV file."""
-    # Use page_size=100 but iterate through all pages
-    expense_service = ExpenseService(db)
-    all_expenses = []
-    page = 1
-    
-    while True:
-        filters = ExpenseFilters(
-            category=category,
-            start_date=start_date,
-            end_date=end_date,
-            page=page,
-            page_size=100
-        )
-        expenses, total_count, _ = expense_service.list_expenses(current_user.id, filters)
-        all_expenses.extend(expenses)
-        
-        if len(all_expenses) >= total_count or len(expenses) == 0:
-            break
-        page += 1
-    
-    expenses = all_expenses
-    
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Date", "Category", "Description", "Amount"])
-    
-    for expense in expenses:
-        writer.writerow([
-            expense.date.strftime("%Y-%m-%d"),
-            expense.category,
-            expense.description,
-            str(expense.amount)
-        ])
-    
-    output.seek(0)
-    
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=expenses.csv"}
+    filters = ExpenseFilters(
+        category=category,
+        start_date=start_date,
+        end_date=end_date
     )
 
+    def row_iter():
+        # Rows are sent in small batches as they are fetched, so memory stays
+        # flat regardless of export size; batching keeps the per-chunk
+        # threadpool hop of a sync iterator off every single row
+        yield _CSV_HEADER
+        lines = []
+        rows = expense_service.iter_export_rows(current_user.id, filters)
+        for expense_date, expense_category, description, amount in rows:
+            lines.append(
+                f"{expense_date.isoformat()[:10]},{_csv_field(expense_category)},"
+                f"{_csv_field(description)},{amount}\r\n"
+            )
+            if len(lines) == _CSV_ROWS_PER_CHUNK:
+                yield "".join(lines).encode("utf-8")
+                lines.clear()
+        if lines:
+            yield "".join(lines).encode("utf-8")
+
+    headers = {
+        "Content-Disposition": "attachment; filename=expenses.csv",
+        "Vary": "Accept-Encoding",
+    }
+    body = row_iter()
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        body = _gzip_chunks(body)
+
+    return StreamingResponse(body, media_type="text/csv", headers=headers)
+
 
 @router.get(
     "/{expense_id}",
@@ -215,10 +259,9 @@ def export_expenses(
 def get_expense(
     expense_id: int,
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    expense_service: ExpenseServiceDep
 ) -> ExpenseResponse:
     """Get a single expense by ID."""
-    expense_service = ExpenseService(db)
     expense = expense_service.get_by_id(expense_id, current_user.id)
     
     if not expense:
@@ -239,11 +282,10 @@ def update_expense(
     expense_id: int,
     expense_data: ExpenseUpdate,
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    expense_service: ExpenseServiceDep
 ) -> ExpenseResponse:
     """Update an existing expense."""
-    expense_service = ExpenseService(db)
-    expense = expense_service.get_by_id(expense_id, current_user.id)
+    expense = expense_service.update_by_id(expense_id, current_user.id, expense_data)
     
     if not expense:
         raise HTTPException(
@@ -251,8 +293,7 @@ def update_expense(
             detail=f"Expense with id {expense_id} not found"
         )
     
-    updated_expense = expense_service.update(expense, expense_data)
-    return updated_expense
+    return expense
 
 
 @router.delete(
@@ -263,19 +304,14 @@ def update_expense(
 def delete_expense(
     expense_id: int,
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    expense_service: ExpenseServiceDep
 ) -> None:
     """Delete an expense."""
-    expense_service = ExpenseService(db)
-    expense = expense_service.get_by_id(expense_id, current_user.id)
-    
-    if not expense:
+    if not expense_service.delete_by_id(expense_id, current_user.id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Expense with id {expense_id} not found"
         )
-    
-    expense_service.delete(expense)
 
 
 @router.get(
@@ -285,11 +321,13 @@ def delete_expense(
 )
 def get_all_tags(
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    expense_service: ExpenseServiceDep
 ) -> list[str]:
     """Get all unique tags used by the authenticated user."""
-    expense_service = ExpenseService(db)
-    return expense_service.get_all_tags(current_user.id)
+    return response_cache.get_or_set(
+        current_user.id, "expense_tags",
+        lambda: expense_service.get_all_tags(current_user.id)
+    )
 
 
 @router.post(
@@ -298,9 +336,9 @@ def get_all_tags(
     summary="Preview CSV import"
 )
 async def preview_import(
-    file: UploadFile = File(...),
-    current_user: CurrentUser = None,
-    db: Session = Depends(get_db)
+    current_user: CurrentUser,
+    import_service: ImportServiceDep,
+    file: UploadFile = File(...)
 ) -> ImportPreview:
     """Preview expenses from CSV file before importing."""
     if not file.filename.endswith('.csv'):
@@ -315,7 +353,6 @@ async def preview_import(
     except UnicodeDecodeError:
         file_content = content.decode('latin-1')
     
-    import_service = ImportService(db)
     return import_service.preview_import(current_user, file_content)
 
 
@@ -325,9 +362,9 @@ async def preview_import(
     summary="Import expenses from CSV"
 )
 async def import_expenses(
-    file: UploadFile = File(...),
-    current_user: CurrentUser = None,
-    db: Session = Depends(get_db)
+    current_user: CurrentUser,
+    import_service: ImportServiceDep,
+    file: UploadFile = File(...)
 ) -> ImportResult:
     """
     Import expenses from a CSV file.
@@ -336,6 +373,9 @@ async def import_expenses(
     Optional columns: currency, tags (comma-separated), notes
     
     Supported date formats: YYYY-MM-DD, DD/MM/YYYY, MM/DD/YYYY, DD-MM-YYYY
+
+    Invalid rows are skipped and reported. A database error while saving
+    rolls back the whole import, and all rows are then counted as errors.
     """
     if not file.filename.endswith('.csv'):
         raise HTTPException(
@@ -349,5 +389,4 @@ async def import_expenses(
     except UnicodeDecodeError:
         file_content = content.decode('latin-1')
     
-    import_service = ImportService(db)
     return import_service.import_expenses(current_user, file_content)
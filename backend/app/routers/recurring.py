@@ -1,16 +1,13 @@
 """Recurring expense API routes."""
 
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, status
 
-from app.database import get_db
 from app.schemas.recurring import (
     RecurringExpenseCreate, RecurringExpenseUpdate, RecurringExpenseResponse,
     RecurringExpenseListResponse, ProcessedRecurringResult
 )
-from app.services.recurring_service import RecurringExpenseService
-from app.core.dependencies import CurrentUser
+from app.core.dependencies import CurrentUser, RecurringServiceDep
 
 router = APIRouter(prefix="/recurring", tags=["recurring"])
 
@@ -24,10 +21,9 @@ router = APIRouter(prefix="/recurring", tags=["recurring"])
 def create_recurring(
     data: RecurringExpenseCreate,
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    service: RecurringServiceDep
 ) -> RecurringExpenseResponse:
     """Create a new recurring expense template."""
-    service = RecurringExpenseService(db)
     return service.create(current_user, data)
 
 
@@ -38,10 +34,9 @@ def create_recurring(
 )
 def list_recurring(
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    service: RecurringServiceDep
 ) -> RecurringExpenseListResponse:
     """List all recurring expenses for the authenticated user."""
-    service = RecurringExpenseService(db)
     return service.list_recurring(current_user.id)
 
 
@@ -52,10 +47,9 @@ def list_recurring(
 )
 def process_recurring(
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    service: RecurringServiceDep
 ) -> ProcessedRecurringResult:
     """Process all due recurring expenses and create actual expense entries."""
-    service = RecurringExpenseService(db)
     return service.process_due_recurring(current_user.id)
 
 
@@ -67,10 +61,9 @@ def process_recurring(
 def get_recurring(
     recurring_id: int,
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    service: RecurringServiceDep
 ) -> RecurringExpenseResponse:
     """Get a specific recurring expense."""
-    service = RecurringExpenseService(db)
     recurring = service.get_by_id(recurring_id, current_user.id)
     
     if not recurring:
@@ -91,10 +84,9 @@ def update_recurring(
     recurring_id: int,
     data: RecurringExpenseUpdate,
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    service: RecurringServiceDep
 ) -> RecurringExpenseResponse:
     """Update a recurring expense."""
-    service = RecurringExpenseService(db)
     recurring = service.get_by_id(recurring_id, current_user.id)
     
     if not recurring:
@@ -114,10 +106,9 @@ def update_recurring(
 def toggle_recurring(
     recurring_id: int,
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    service: RecurringServiceDep
 ) -> RecurringExpenseResponse:
     """Toggle active/inactive status of a recurring expense."""
-    service = RecurringExpenseService(db)
     recurring = service.get_by_id(recurring_id, current_user.id)
     
     if not recurring:
@@ -137,10 +128,9 @@ def toggle_recurring(
 def delete_recurring(
     recurring_id: int,
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    service: RecurringServiceDep
 ) -> None:
     """Delete a recurring expense."""
-    service = RecurringExpenseService(db)
     recurring = service.get_by_id(recurring_id, current_user.id)
     
     if not recurring:
@@ -1,12 +1,9 @@
 """User profile API routes."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, status
 
-from app.database import get_db
 from app.schemas.user import UserResponse, UserUpdate, ThemeUpdate
-from app.services.user_service import UserService
-from app.core.dependencies import CurrentUser
+from app.core.dependencies import CurrentUser, UserServiceDep
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -31,11 +28,9 @@ def get_current_user_profile(
 def update_current_user_profile(
     user_data: UserUpdate,
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    user_service: UserServiceDep
 ) -> UserResponse:
     """Update the currently authenticated user's profile."""
-    user_service = UserService(db)
-    
     # Check if new email is taken
     if user_data.email and user_service.is_email_taken(user_data.email, current_user.id):
         raise HTTPException(
@@ -54,10 +49,9 @@ def update_current_user_profile(
 )
 def deactivate_account(
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    user_service: UserServiceDep
 ) -> None:
     """Deactivate the currently authenticated user's account."""
-    user_service = UserService(db)
     user_service.deactivate(current_user)
 
 
@@ -69,12 +63,8 @@ def deactivate_account(
 def update_theme(
     theme_data: ThemeUpdate,
     current_user: CurrentUser,
-    db: Session = Depends(get_db)
+    user_service: UserServiceDep
 ) -> UserResponse:
     """Update the user's theme preference (dark/light)."""
-    user_service = UserService(db)
-    current_user.theme = theme_data.theme
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+    return user_service.update(current_user, UserUpdate(theme=theme_data.theme))
 
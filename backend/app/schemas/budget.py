@@ -26,7 +26,7 @@ class BudgetUpdate(BaseModel):
 
 class BudgetResponse(BudgetBase):
     """Schema for budget response."""
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True)
     
     id: int
     created_at: datetime
@@ -35,26 +35,32 @@ class BudgetResponse(BudgetBase):
 
 class BudgetStatus(BaseModel):
     """Budget status with current spending."""
+    model_config = ConfigDict(frozen=True)
+
     budget: BudgetResponse
     current_spending: Decimal
     remaining: Decimal
-    percentage_used: Decimal
+    percentage_used: float
     is_over_budget: bool
     is_alert: bool  # True if spending >= alert_threshold
 
 
 class BudgetAlert(BaseModel):
     """Budget alert notification."""
+    model_config = ConfigDict(frozen=True)
+
     category: str
     monthly_limit: Decimal
     current_spending: Decimal
-    percentage_used: Decimal
+    percentage_used: float
     message: str
     severity: str  # "warning" (approaching), "danger" (over budget)
 
 
 class BudgetOverview(BaseModel):
     """Overview of all budgets with status."""
+    model_config = ConfigDict(frozen=True)
+
     budgets: List[BudgetStatus]
     alerts: List[BudgetAlert]
     total_budgeted: Decimal
@@ -2,12 +2,29 @@
 
 from datetime import datetime, date
 from decimal import Decimal
-from typing import Optional, List, Literal
+from itertools import islice
+from typing import Iterable, Optional, List, Literal
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 
 
-# Supported currencies
-SUPPORTED_CURRENCIES = ["INR", "USD", "EUR", "GBP", "JPY", "AUD", "CAD"]
+# Supported currencies; the set gives O(1) membership checks on every validation
+_CURRENCY_CODES = ("INR", "USD", "EUR", "GBP", "JPY", "AUD", "CAD")
+SUPPORTED_CURRENCIES = frozenset(_CURRENCY_CODES)
+_CURRENCY_ERROR = f"Currency must be one of: {', '.join(_CURRENCY_CODES)}"
+
+MAX_TAGS = 10
+_CENTS = Decimal("0.01")
+
+
+def normalize_tags(tags: Iterable[str]) -> List[str]:
+    """Strip and lowercase tags, dropping blanks and stopping after MAX_TAGS."""
+    stripped = (tag.strip() for tag in tags)
+    return [tag.lower() for tag in islice(filter(None, stripped), MAX_TAGS)]
+
+
+def round_to_cents(v: Decimal) -> Decimal:
+    """Round to 2 decimal places; same result as round(v, 2), so 100 becomes 100.00."""
+    return v.quantize(_CENTS)
 
 
 class ExpenseBase(BaseModel):
@@ -31,20 +48,20 @@ class ExpenseBase(BaseModel):
     @field_validator('amount')
     @classmethod
     def round_amount(cls, v: Decimal) -> Decimal:
-        return round(v, 2)
+        return round_to_cents(v)
     
     @field_validator('currency')
     @classmethod
     def validate_currency(cls, v: str) -> str:
         v = v.upper()
         if v not in SUPPORTED_CURRENCIES:
-            raise ValueError(f"Currency must be one of: {', '.join(SUPPORTED_CURRENCIES)}")
+            raise ValueError(_CURRENCY_ERROR)
         return v
     
     @field_validator('tags')
     @classmethod
     def clean_tags(cls, v: List[str]) -> List[str]:
-        return [tag.strip().lower() for tag in v if tag.strip()][:10]  # Max 10 tags
+        return normalize_tags(v)
 
 
 class ExpenseCreate(ExpenseBase):
@@ -76,7 +93,7 @@ class ExpenseUpdate(BaseModel):
     @field_validator('amount')
     @classmethod
     def round_amount(cls, v: Optional[Decimal]) -> Optional[Decimal]:
-        return round(v, 2) if v else v
+        return round_to_cents(v) if v else v
     
     @field_validator('currency')
     @classmethod
@@ -84,14 +101,14 @@ class ExpenseUpdate(BaseModel):
         if v:
             v = v.upper()
             if v not in SUPPORTED_CURRENCIES:
-                raise ValueError(f"Currency must be one of: {', '.join(SUPPORTED_CURRENCIES)}")
+                raise ValueError(_CURRENCY_ERROR)
         return v
     
     @field_validator('tags')
     @classmethod
     def clean_tags(cls, v: Optional[List[str]]) -> Optional[List[str]]:
         if v:
-            return [tag.strip().lower() for tag in v if tag.strip()][:10]
+            return normalize_tags(v)
         return v
 
 
@@ -125,6 +142,7 @@ class ExpenseListResponse(BaseModel):
     page: int = Field(default=1)
     page_size: int = Field(default=50)
     total_pages: int = Field(default=1)
+    next_cursor: Optional[str] = Field(default=None, description="Cursor for the next page, if any")
 
 
 class ExpenseFilters(BaseModel):
@@ -141,11 +159,14 @@ class ExpenseFilters(BaseModel):
     sort: Optional[Literal["date_desc", "date_asc", "amount_desc", "amount_asc"]] = None
     page: int = Field(default=1, ge=1)
     page_size: int = Field(default=50, ge=1, le=100)
+    cursor: Optional[str] = Field(default=None, description="Keyset cursor; takes precedence over page")
 
 
 class ExpenseSummary(BaseModel):
     """Schema for expense summary/analytics."""
-    
+
+    model_config = ConfigDict(frozen=True)
+
     total_expenses: Decimal
     expense_count: int
     average_expense: Decimal
@@ -155,14 +176,20 @@ class ExpenseSummary(BaseModel):
 
 class CategoryData(BaseModel):
     """Category analytics data."""
+
+    model_config = ConfigDict(frozen=True)
+
     category: str
     total: Decimal
     count: int
-    percentage: Decimal
+    percentage: float
 
 
 class MonthlyData(BaseModel):
     """Monthly analytics data."""
+
+    model_config = ConfigDict(frozen=True)
+
     month: str
     total: Decimal
     count: int
@@ -170,6 +197,9 @@ class MonthlyData(BaseModel):
 
 class DailyData(BaseModel):
     """Daily analytics data."""
+
+    model_config = ConfigDict(frozen=True)
+
     date: str
     total: Decimal
     count: int
@@ -177,7 +207,9 @@ class DailyData(BaseModel):
 
 class AnalyticsResponse(BaseModel):
     """Comprehensive analytics response."""
-    
+
+    model_config = ConfigDict(frozen=True)
+
     # Summary
     total_expenses: Decimal
     expense_count: int
@@ -195,7 +227,7 @@ class AnalyticsResponse(BaseModel):
     # Trends
     current_month_total: Decimal
     previous_month_total: Decimal
-    month_over_month_change: Decimal  # Percentage change
+    month_over_month_change: float  # Percentage change
     
     # Top categories
     top_category: Optional[str]
@@ -6,6 +6,17 @@ from typing import Optional, List, Literal
 from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator
 
 
+# Frequency -> (schedule fields it needs, error when one is missing)
+_REQUIRED_SCHEDULE_FIELDS = {
+    "weekly": (("day_of_week",), "day_of_week required for weekly frequency"),
+    "monthly": (("day_of_month",), "day_of_month required for monthly frequency"),
+    "yearly": (
+        ("day_of_month", "month_of_year"),
+        "day_of_month and month_of_year required for yearly frequency"
+    ),
+}
+
+
 class RecurringExpenseBase(BaseModel):
     """Base recurring expense schema."""
     amount: Decimal = Field(..., gt=0)
@@ -20,13 +31,11 @@ class RecurringExpenseBase(BaseModel):
 
     @model_validator(mode='after')
     def validate_recurrence_params(self):
-        if self.frequency == "weekly" and self.day_of_week is None:
-            raise ValueError("day_of_week required for weekly frequency")
-        if self.frequency == "monthly" and self.day_of_month is None:
-            raise ValueError("day_of_month required for monthly frequency")
-        if self.frequency == "yearly":
-            if self.day_of_month is None or self.month_of_year is None:
-                raise ValueError("day_of_month and month_of_year required for yearly frequency")
+        required = _REQUIRED_SCHEDULE_FIELDS.get(self.frequency)
+        if required:
+            fields, message = required
+            if any(getattr(self, field) is None for field in fields):
+                raise ValueError(message)
         if self.end_date and self.end_date < self.start_date:
             raise ValueError("end_date must be after start_date")
         return self
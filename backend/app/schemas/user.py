@@ -5,6 +5,13 @@ from typing import Optional
 from pydantic import BaseModel, EmailStr, Field, field_validator, ConfigDict
 import re
 
+_USERNAME_RE = re.compile(r'^[a-zA-Z0-9_]+$')
+_UPPER_RE = re.compile(r'[A-Z]')
+_LOWER_RE = re.compile(r'[a-z]')
+_DIGIT_RE = re.compile(r'\d')
+# Valid passwords pass this one check; the per-class scans only name the failure
+_STRONG_PASSWORD_RE = re.compile(r'(?=.*[A-Z])(?=.*[a-z])(?=.*\d)', re.DOTALL)
+
 
 class UserCreate(BaseModel):
     """Schema for user registration."""
@@ -17,18 +24,20 @@ class UserCreate(BaseModel):
     @field_validator('username')
     @classmethod
     def username_alphanumeric(cls, v: str) -> str:
-        if not re.match(r'^[a-zA-Z0-9_]+$', v):
+        if not _USERNAME_RE.match(v):
             raise ValueError('Username must be alphanumeric with underscores only')
         return v.lower()
 
     @field_validator('password')
     @classmethod
     def password_strength(cls, v: str) -> str:
-        if not re.search(r'[A-Z]', v):
+        if _STRONG_PASSWORD_RE.match(v):
+            return v
+        if not _UPPER_RE.search(v):
             raise ValueError('Password must contain at least one uppercase letter')
-        if not re.search(r'[a-z]', v):
+        if not _LOWER_RE.search(v):
             raise ValueError('Password must contain at least one lowercase letter')
-        if not re.search(r'\d', v):
+        if not _DIGIT_RE.search(v):
             raise ValueError('Password must contain at least one digit')
         return v
 
@@ -4,8 +4,10 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Optional, List
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
+from sqlalchemy import func
 
+from app.core.cache import response_cache
+from app.database import UPSERT_INSERTS, utcnow
 from app.models.budget import Budget
 from app.models.expense import Expense
 from app.models.user import User
@@ -36,7 +38,33 @@ class BudgetService:
         ).first()
 
     def create(self, user: User, budget_data: BudgetCreate) -> Budget:
-        """Create a new budget."""
+        """Create a new budget, or update the existing one for the category."""
+        insert = UPSERT_INSERTS.get(self.db.get_bind().dialect.name)
+        if insert is None:
+            return self._create_or_update(user, budget_data)
+
+        # One INSERT ... ON CONFLICT on (user_id, category) instead of SELECT then write
+        stmt = insert(Budget).values(
+            user_id=user.id,
+            category=budget_data.category,
+            monthly_limit=budget_data.monthly_limit,
+            alert_threshold=budget_data.alert_threshold
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Budget.user_id, Budget.category],
+            set_={
+                "monthly_limit": stmt.excluded.monthly_limit,
+                "alert_threshold": stmt.excluded.alert_threshold,
+                "updated_at": utcnow()
+            }
+        ).returning(Budget)
+        budget = self.db.scalars(stmt, execution_options={"populate_existing": True}).one()
+        self.db.commit()
+        response_cache.invalidate(user.id)
+        return budget
+
+    def _create_or_update(self, user: User, budget_data: BudgetCreate) -> Budget:
+        """Create or update a budget on databases without ON CONFLICT support."""
         # Check if budget for this category already exists
         existing = self.get_by_category(user.id, budget_data.category)
         if existing:
@@ -44,6 +72,7 @@ class BudgetService:
             existing.monthly_limit = budget_data.monthly_limit
             existing.alert_threshold = budget_data.alert_threshold
             self.db.commit()
+            response_cache.invalidate(user.id)
             self.db.refresh(existing)
             return existing
 
@@ -55,6 +84,7 @@ class BudgetService:
         )
         self.db.add(budget)
         self.db.commit()
+        response_cache.invalidate(user.id)
         self.db.refresh(budget)
         return budget
 
@@ -64,44 +94,81 @@ class BudgetService:
         for field, value in update_data.items():
             setattr(budget, field, value)
         self.db.commit()
+        response_cache.invalidate(budget.user_id)
         self.db.refresh(budget)
         return budget
 
     def delete(self, budget: Budget) -> bool:
         """Delete a budget."""
+        user_id = budget.user_id
         self.db.delete(budget)
         self.db.commit()
+        response_cache.invalidate(user_id)
         return True
 
     def list_budgets(self, user_id: int) -> List[Budget]:
         """List all budgets for a user."""
         return self.db.query(Budget).filter(Budget.user_id == user_id).all()
 
+    def _month_conditions(self, user_id: int, year: int, month: int) -> list:
+        """Filter a user's expenses to one calendar month with an index-friendly range."""
+        start = datetime(year, month, 1)
+        end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+        return [Expense.user_id == user_id, Expense.date >= start, Expense.date < end]
+
     def get_category_spending(self, user_id: int, category: str, year: int, month: int) -> Decimal:
         """Get total spending for a category in a specific month."""
         result = self.db.query(func.sum(Expense.amount)).filter(
-            Expense.user_id == user_id,
             Expense.category == category,
-            extract('year', Expense.date) == year,
-            extract('month', Expense.date) == month
+            *self._month_conditions(user_id, year, month)
         ).scalar()
-        return Decimal(str(result)) if result else Decimal("0")
+        # SUM over a Numeric column already comes back as a Decimal
+        return result or Decimal("0")
+
+    def _spending_by_category(self, user_id: int, year: int, month: int) -> dict[str, Decimal]:
+        """Get total spending per category in a specific month, in one query."""
+        rows = self.db.query(Expense.category, func.sum(Expense.amount)).filter(
+            *self._month_conditions(user_id, year, month)
+        ).group_by(Expense.category).all()
+        return {category: total for category, total in rows if total}
 
-    def get_budget_status(self, budget: Budget, year: int = None, month: int = None) -> BudgetStatus:
-        """Get status of a single budget including current spending."""
+    def get_budget_status(
+        self,
+        budget: Budget,
+        year: int = None,
+        month: int = None,
+        current_spending: Optional[Decimal] = None
+    ) -> BudgetStatus:
+        """
+        Get status of a single budget including current spending.
+        Pass current_spending when it is already known to skip the query.
+        """
         now = datetime.now()
         year = year or now.year
         month = month or now.month
 
-        current_spending = self.get_category_spending(
-            budget.user_id, budget.category, year, month
-        )
+        if current_spending is None:
+            current_spending = self.get_category_spending(
+                budget.user_id, budget.category, year, month
+            )
         
         remaining = budget.monthly_limit - current_spending
-        percentage_used = (current_spending / budget.monthly_limit * 100) if budget.monthly_limit > 0 else Decimal("0")
+        # Display ratio only: float math, amounts stay Decimal
+        percentage_used = (
+            float(current_spending) / float(budget.monthly_limit) * 100.0
+            if budget.monthly_limit > 0 else 0.0
+        )
         
         return BudgetStatus(
-            budget=BudgetResponse.model_validate(budget),
+            # Columns are already typed by the ORM, so skip re-validating them
+            budget=BudgetResponse.model_construct(
+                id=budget.id,
+                category=budget.category,
+                monthly_limit=budget.monthly_limit,
+                alert_threshold=budget.alert_threshold,
+                created_at=budget.created_at,
+                updated_at=budget.updated_at
+            ),
             current_spending=current_spending,
             remaining=max(remaining, Decimal("0")),
             percentage_used=round(percentage_used, 1),
@@ -113,6 +180,7 @@ class BudgetService:
         """Get overview of all budgets with alerts."""
         budgets = self.list_budgets(user_id)
         now = datetime.now()
+        spending = self._spending_by_category(user_id, now.year, now.month) if budgets else {}
         
         budget_statuses = []
         alerts = []
@@ -121,7 +189,9 @@ class BudgetService:
         categories_over_budget = 0
 
         for budget in budgets:
-            status = self.get_budget_status(budget, now.year, now.month)
+            status = self.get_budget_status(
+                budget, now.year, now.month, spending.get(budget.category, Decimal("0"))
+            )
             budget_statuses.append(status)
             total_budgeted += budget.monthly_limit
             total_spent += status.current_spending
@@ -163,7 +233,10 @@ class BudgetService:
         now = datetime.now()
         current_spending = self.get_category_spending(user_id, category, now.year, now.month)
         new_total = current_spending + amount
-        percentage = (new_total / budget.monthly_limit * 100) if budget.monthly_limit > 0 else Decimal("0")
+        percentage = (
+            float(new_total) / float(budget.monthly_limit) * 100.0
+            if budget.monthly_limit > 0 else 0.0
+        )
 
         if new_total > budget.monthly_limit:
             return BudgetAlert(
@@ -1,6 +1,7 @@
 """Currency conversion service."""
 
 from decimal import Decimal
+from functools import lru_cache
 from typing import Dict
 from datetime import datetime
 
@@ -17,25 +18,53 @@ EXCHANGE_RATES: Dict[str, Decimal] = {
     "CAD": Decimal("61.25"),      # 1 CAD = 61.25 INR
 }
 
+# The rate table is static, so the code list is built once
+SUPPORTED_CURRENCY_CODES = tuple(EXCHANGE_RATES)
+
+CURRENCY_SYMBOLS: Dict[str, str] = {
+    "INR": "₹",
+    "USD": "$",
+    "EUR": "€",
+    "GBP": "£",
+    "JPY": "¥",
+    "AUD": "A$",
+    "CAD": "C$",
+}
+
+
+# Rates are static, so results are memoized per (normalized) currency code
+@lru_cache(maxsize=64)
+def _rate(from_code: str, to_code: str) -> Decimal:
+    from_rate = EXCHANGE_RATES.get(from_code, Decimal("1.0"))
+    to_rate = EXCHANGE_RATES.get(to_code, Decimal("1.0"))
+
+    # Convert: amount_in_from * from_rate / to_rate = amount_in_to
+    if to_rate == 0:
+        return Decimal("1.0")
+    return from_rate / to_rate
+
+
+@lru_cache(maxsize=16)
+def _all_rates(base_code: str) -> tuple[tuple[str, Decimal], ...]:
+    base_rate = EXCHANGE_RATES.get(base_code, Decimal("1.0"))
+    return tuple(
+        (code, round(rate / base_rate, 4) if base_rate > 0 else rate)
+        for code, rate in EXCHANGE_RATES.items()
+    )
+
 
 class CurrencyService:
     """Service for currency operations."""
 
     @staticmethod
-    def get_supported_currencies() -> list[str]:
-        """Get list of supported currency codes."""
-        return list(EXCHANGE_RATES.keys())
+    def get_supported_currencies() -> tuple[str, ...]:
+        """Get the supported currency codes."""
+        return SUPPORTED_CURRENCY_CODES
 
     @staticmethod
     def get_rate(from_currency: str, to_currency: str = "INR") -> Decimal:
         """Get exchange rate between two currencies."""
-        from_rate = EXCHANGE_RATES.get(from_currency.upper(), Decimal("1.0"))
-        to_rate = EXCHANGE_RATES.get(to_currency.upper(), Decimal("1.0"))
-        
-        # Convert: amount_in_from * from_rate / to_rate = amount_in_to
-        if to_rate == 0:
-            return Decimal("1.0")
-        return from_rate / to_rate
+        return _rate(from_currency.upper(), to_currency.upper())
 
     @staticmethod
     def convert(amount: Decimal, from_currency: str, to_currency: str = "INR") -> Decimal:
@@ -46,24 +75,10 @@ class CurrencyService:
     @staticmethod
     def get_all_rates(base_currency: str = "INR") -> Dict[str, Decimal]:
         """Get all exchange rates relative to a base currency."""
-        base_rate = EXCHANGE_RATES.get(base_currency.upper(), Decimal("1.0"))
-        return {
-            code: round(rate / base_rate, 4) if base_rate > 0 else rate
-            for code, rate in EXCHANGE_RATES.items()
-        }
+        return dict(_all_rates(base_currency.upper()))
 
     @staticmethod
     def format_currency(amount: Decimal, currency: str) -> str:
         """Format amount with currency symbol."""
-        symbols = {
-            "INR": "₹",
-            "USD": "$",
-            "EUR": "€",
-            "GBP": "£",
-            "JPY": "¥",
-            "AUD": "A$",
-            "CAD": "C$"
-        }
-        symbol = symbols.get(currency.upper(), currency)
+        symbol = CURRENCY_SYMBOLS.get(currency.upper(), currency)
         return f"{symbol}{amount:,.2f}"
-
@@ -1,12 +1,15 @@
 """Expense service for business logic."""
 
-from datetime import datetime, timedelta
-from decimal import Decimal
-from typing import Optional, List, Tuple
+import base64
+from datetime import datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any, Iterator, Optional, List, Tuple
 from collections import defaultdict
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc, func, extract
+from sqlalchemy.orm import Session, raiseload
+from sqlalchemy import Date, delete, desc, asc, func, extract, tuple_, or_, and_, update
 
+from app.core.cache import response_cache
+from app.database import UPSERT_INSERTS
 from app.models.expense import Expense
 from app.models.user import User
 from app.schemas.expense import (
@@ -15,6 +18,43 @@ from app.schemas.expense import (
 )
 
 
+# Sort option -> (keyset column, descending); id always breaks ties, newest first
+_SORT_KEYS = {
+    None: (Expense.id, True),
+    "date_desc": (Expense.date, True),
+    "date_asc": (Expense.date, False),
+    "amount_desc": (Expense.amount, True),
+    "amount_asc": (Expense.amount, False),
+}
+
+# (total, count) for a month or day with no expenses
+_EMPTY_BUCKET = (Decimal("0"), 0)
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(expense: Expense, sort_column) -> str:
+    """Encode the keyset position of an expense as an opaque cursor."""
+    value = getattr(expense, sort_column.key)
+    value = value.isoformat() if isinstance(value, datetime) else str(value)
+    return base64.urlsafe_b64encode(f"{value}|{expense.id}".encode()).decode()
+
+
+def decode_cursor(cursor: str, sort_column) -> Tuple[Any, int]:
+    """Decode a cursor into (sort value, id). Raises InvalidCursorError if malformed."""
+    try:
+        value, last_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        if sort_column is Expense.date:
+            return datetime.fromisoformat(value), int(last_id)
+        if sort_column is Expense.amount:
+            return Decimal(value), int(last_id)
+        return int(value), int(last_id)
+    except (ValueError, UnicodeError, InvalidOperation) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+
 class ExpenseService:
     """Service class for expense operations."""
 
@@ -37,13 +77,7 @@ class ExpenseService:
 
     def create(self, user: User, expense_data: ExpenseCreate) -> Expense:
         """Create a new expense for a user."""
-        # Check for idempotency
-        if expense_data.idempotency_key:
-            existing = self.get_by_idempotency_key(expense_data.idempotency_key, user.id)
-            if existing:
-                return existing
-
-        expense = Expense(
+        values = dict(
             user_id=user.id,
             amount=expense_data.amount,
             category=expense_data.category,
@@ -54,37 +88,79 @@ class ExpenseService:
             tags=expense_data.tags or [],
             notes=expense_data.notes
         )
+
+        insert = UPSERT_INSERTS.get(self.db.get_bind().dialect.name)
+        if expense_data.idempotency_key and insert is not None:
+            # Insert unless the key was already used; a retry costs one extra SELECT
+            expense = self.db.scalars(
+                insert(Expense).values(**values).on_conflict_do_nothing(
+                    index_elements=[Expense.user_id, Expense.idempotency_key]
+                ).returning(Expense)
+            ).first()
+            if expense is None:
+                return self.get_by_idempotency_key(expense_data.idempotency_key, user.id)
+            self.db.commit()
+            response_cache.invalidate(user.id)
+            return expense
+
+        # Check for idempotency
+        if expense_data.idempotency_key:
+            existing = self.get_by_idempotency_key(expense_data.idempotency_key, user.id)
+            if existing:
+                return existing
+
+        expense = Expense(**values)
         self.db.add(expense)
         self.db.commit()
+        response_cache.invalidate(user.id)
         self.db.refresh(expense)
         return expense
 
-    def update(self, expense: Expense, expense_data: ExpenseUpdate) -> Expense:
-        """Update an existing expense."""
+    def update_by_id(
+        self, expense_id: int, user_id: int, expense_data: ExpenseUpdate
+    ) -> Optional[Expense]:
+        """
+        Update a user's expense in a single UPDATE ... RETURNING statement.
+        Returns None if the expense does not exist for that user.
+        """
         update_data = expense_data.model_dump(exclude_unset=True)
-        
-        for field, value in update_data.items():
-            setattr(expense, field, value)
-        
+        if not update_data:
+            return self.get_by_id(expense_id, user_id)
+
+        expense = self.db.scalars(
+            update(Expense)
+            .where(Expense.id == expense_id, Expense.user_id == user_id)
+            .values(**update_data)
+            .returning(Expense),
+            execution_options={"synchronize_session": "fetch"}
+        ).first()
+        if expense is None:
+            return None
+
         self.db.commit()
-        self.db.refresh(expense)
+        response_cache.invalidate(user_id)
         return expense
 
-    def delete(self, expense: Expense) -> bool:
-        """Delete an expense."""
-        self.db.delete(expense)
+    def delete_by_id(self, expense_id: int, user_id: int) -> bool:
+        """
+        Delete a user's expense in a single DELETE ... RETURNING statement.
+        Returns False if the expense does not exist for that user.
+        """
+        deleted_id = self.db.scalar(
+            delete(Expense)
+            .where(Expense.id == expense_id, Expense.user_id == user_id)
+            .returning(Expense.id),
+            execution_options={"synchronize_session": "fetch"}
+        )
+        if deleted_id is None:
+            return False
+
         self.db.commit()
+        response_cache.invalidate(user_id)
         return True
 
-    def list_expenses(
-        self, 
-        user_id: int, 
-        filters: ExpenseFilters
-    ) -> Tuple[List[Expense], int, Decimal]:
-        """
-        List expenses with filtering, sorting, and pagination.
-        Returns: (expenses, total_count, total_amount)
-        """
+    def _filtered_query(self, user_id: int, filters: ExpenseFilters):
+        """Build the expense query for a user with filters applied."""
         query = self.db.query(Expense).filter(Expense.user_id == user_id)
 
         # Apply filters
@@ -92,10 +168,10 @@ class ExpenseService:
             query = query.filter(Expense.category.ilike(f"%{filters.category}%"))
         
         if filters.start_date:
-            query = query.filter(Expense.date >= datetime.combine(filters.start_date, datetime.min.time()))
+            query = query.filter(Expense.date >= datetime.combine(filters.start_date, time.min))
         
         if filters.end_date:
-            query = query.filter(Expense.date <= datetime.combine(filters.end_date, datetime.max.time()))
+            query = query.filter(Expense.date <= datetime.combine(filters.end_date, time.max))
         
         if filters.min_amount is not None:
             query = query.filter(Expense.amount >= filters.min_amount)
@@ -107,41 +183,117 @@ class ExpenseService:
         if filters.search:
             query = query.filter(Expense.description.ilike(f"%{filters.search}%"))
 
-        # Get total count and sum before pagination
-        total_count = query.count()
-        total_amount = self.db.query(func.sum(Expense.amount)).filter(
-            Expense.id.in_([e.id for e in query.all()])
-        ).scalar() or Decimal("0")
-
-        # Apply sorting
-        sort_mapping = {
-            "date_desc": desc(Expense.date),
-            "date_asc": asc(Expense.date),
-            "amount_desc": desc(Expense.amount),
-            "amount_asc": asc(Expense.amount),
-        }
-        
-        if filters.sort and filters.sort in sort_mapping:
-            query = query.order_by(sort_mapping[filters.sort], desc(Expense.created_at))
+        return query
+
+    def list_expenses(
+        self, 
+        user_id: int, 
+        filters: ExpenseFilters
+    ) -> Tuple[List[Expense], int, Decimal, Optional[str]]:
+        """
+        List expenses with filtering, sorting, and pagination.
+        Returns: (expenses, total_count, total_amount, next_cursor)
+        """
+        query = self._filtered_query(user_id, filters)
+        filtered = query
+        # Tags live in a JSON column and responses never touch Expense.user, so
+        # a page is one statement; raise rather than silently lazy-load per row
+        query = query.options(raiseload("*"))
+
+        sort_column, descending = _SORT_KEYS.get(filters.sort, _SORT_KEYS[None])
+
+        # Newest first within equal sort values; ids follow insertion order
+        if sort_column is Expense.id:
+            query = query.order_by(desc(Expense.id))
         else:
-            query = query.order_by(desc(Expense.created_at))
+            query = query.order_by(
+                desc(sort_column) if descending else asc(sort_column), desc(Expense.id)
+            )
 
-        # Apply pagination
-        offset = (filters.page - 1) * filters.page_size
-        expenses = query.offset(offset).limit(filters.page_size).all()
+        if filters.cursor:
+            # Keyset pagination: continue after the last row of the previous page
+            value, last_id = decode_cursor(filters.cursor, sort_column)
+            if sort_column is Expense.id:
+                query = query.filter(Expense.id < last_id)
+            elif descending:
+                query = query.filter(tuple_(sort_column, Expense.id) < (value, last_id))
+            else:
+                query = query.filter(or_(
+                    sort_column > value,
+                    and_(sort_column == value, Expense.id < last_id)
+                ))
+        else:
+            # Totals over the whole filtered set ride along on each page row
+            query = query.add_columns(
+                func.count(Expense.id).over(), func.sum(Expense.amount).over()
+            ).offset((filters.page - 1) * filters.page_size)
+
+        # Fetch one extra row to learn whether another page exists
+        rows = query.limit(filters.page_size + 1).all()
+
+        if filters.cursor or not rows:
+            # A cursor narrows the WHERE clause and an empty page carries no
+            # totals, so aggregate the filtered set separately
+            expenses = rows
+            total_count, total_amount = filtered.with_entities(
+                func.count(Expense.id), func.sum(Expense.amount)
+            ).one()
+        else:
+            expenses = [row[0] for row in rows]
+            total_count, total_amount = rows[0][1], rows[0][2]
+        total_amount = total_amount or Decimal("0")
+
+        next_cursor = None
+        if len(expenses) > filters.page_size:
+            expenses = expenses[:filters.page_size]
+            next_cursor = encode_cursor(expenses[-1], sort_column)
+
+        return expenses, total_count, total_amount, next_cursor
+
+    def iter_export_rows(
+        self,
+        user_id: int,
+        filters: ExpenseFilters,
+        chunk_size: int = 1000
+    ) -> Iterator[Tuple[datetime, str, str, Decimal]]:
+        """
+        Yield (date, category, description, amount) for filtered expenses,
+        newest first, fetching chunk_size rows at a time.
 
-        return expenses, total_count, total_amount
+        Only the exported columns are selected, so no ORM objects are built.
+        """
+        query = self._filtered_query(user_id, filters).with_entities(
+            Expense.date, Expense.category, Expense.description, Expense.amount
+        ).order_by(desc(Expense.id))
+        yield from query.yield_per(chunk_size)
+
+    def _monthly_category_totals(self, user_id: int, *conditions) -> list:
+        """
+        Aggregate expenses per (year, month, category) in the database.
+
+        Each row carries SUM, COUNT, MAX and MIN, which is enough to derive
+        totals, averages and extremes without loading individual expenses.
+        """
+        year = extract('year', Expense.date)
+        month = extract('month', Expense.date)
+        return self.db.query(
+            year.label("year"),
+            month.label("month"),
+            Expense.category,
+            func.sum(Expense.amount).label("total"),
+            func.count(Expense.id).label("count"),
+            func.max(Expense.amount).label("highest"),
+            func.min(Expense.amount).label("lowest"),
+        ).filter(
+            Expense.user_id == user_id, *conditions
+        ).group_by(year, month, Expense.category).all()
 
     def get_summary(self, user_id: int, year: Optional[int] = None) -> ExpenseSummary:
         """Get expense summary/analytics for a user."""
-        query = self.db.query(Expense).filter(Expense.user_id == user_id)
+        conditions = [extract('year', Expense.date) == year] if year else []
+        rows = self._monthly_category_totals(user_id, *conditions)
         
-        if year:
-            query = query.filter(extract('year', Expense.date) == year)
-
-        expenses = query.all()
-        
-        if not expenses:
+        if not rows:
             return ExpenseSummary(
                 total_expenses=Decimal("0"),
                 expense_count=0,
@@ -150,20 +302,16 @@ class ExpenseService:
                 monthly_totals={}
             )
 
-        total = sum(Decimal(str(e.amount)) for e in expenses)
-        count = len(expenses)
+        total = sum((row.total for row in rows), Decimal("0"))
+        count = sum(row.count for row in rows)
         average = total / count if count > 0 else Decimal("0")
 
-        # Category breakdown
+        # Category breakdown and monthly totals
         category_totals: dict[str, Decimal] = defaultdict(Decimal)
-        for expense in expenses:
-            category_totals[expense.category] += Decimal(str(expense.amount))
-
-        # Monthly totals
         monthly_totals: dict[str, Decimal] = defaultdict(Decimal)
-        for expense in expenses:
-            month_key = expense.date.strftime("%Y-%m")
-            monthly_totals[month_key] += Decimal(str(expense.amount))
+        for row in rows:
+            category_totals[row.category] += row.total
+            monthly_totals[f"{int(row.year):04d}-{int(row.month):02d}"] += row.total
 
         return ExpenseSummary(
             total_expenses=total,
@@ -175,14 +323,12 @@ class ExpenseService:
 
     def get_analytics(self, user_id: int, months: int = 12) -> AnalyticsResponse:
         """Get comprehensive analytics for a user."""
-        # Get expenses for the time period
-        start_date = datetime.now() - timedelta(days=months * 30)
-        expenses = self.db.query(Expense).filter(
-            Expense.user_id == user_id,
-            Expense.date >= start_date
-        ).all()
+        # Aggregate expenses for the time period
+        now = datetime.now()
+        start_date = now - timedelta(days=months * 30)
+        rows = self._monthly_category_totals(user_id, Expense.date >= start_date)
 
-        if not expenses:
+        if not rows:
             return AnalyticsResponse(
                 total_expenses=Decimal("0"),
                 expense_count=0,
@@ -194,81 +340,89 @@ class ExpenseService:
                 daily_data=[],
                 current_month_total=Decimal("0"),
                 previous_month_total=Decimal("0"),
-                month_over_month_change=Decimal("0"),
+                month_over_month_change=0.0,
                 top_category=None,
                 top_category_amount=Decimal("0")
             )
 
         # Basic stats
-        amounts = [Decimal(str(e.amount)) for e in expenses]
-        total = sum(amounts)
-        count = len(expenses)
+        total = sum((row.total for row in rows), Decimal("0"))
+        count = sum(row.count for row in rows)
         average = total / count if count > 0 else Decimal("0")
-        highest = max(amounts)
-        lowest = min(amounts)
+        highest = max(row.highest for row in rows)
+        lowest = min(row.lowest for row in rows)
+
+        # Category and monthly totals as [total, count]
+        category_totals: dict[str, list] = {}
+        monthly_totals: dict[str, list] = {}
+        for row in rows:
+            bucket = category_totals.get(row.category)
+            if bucket is None:
+                category_totals[row.category] = [row.total, row.count]
+            else:
+                bucket[0] += row.total
+                bucket[1] += row.count
+            month_key = f"{int(row.year):04d}-{int(row.month):02d}"
+            bucket = monthly_totals.get(month_key)
+            if bucket is None:
+                monthly_totals[month_key] = [row.total, row.count]
+            else:
+                bucket[0] += row.total
+                bucket[1] += row.count
 
         # Category breakdown with percentages
-        category_totals: dict[str, dict] = defaultdict(lambda: {"total": Decimal("0"), "count": 0})
-        for expense in expenses:
-            category_totals[expense.category]["total"] += Decimal(str(expense.amount))
-            category_totals[expense.category]["count"] += 1
-
         categories = []
-        for cat, data in sorted(category_totals.items(), key=lambda x: x[1]["total"], reverse=True):
-            percentage = (data["total"] / total * 100) if total > 0 else Decimal("0")
+        for cat, (cat_total, cat_count) in sorted(
+            category_totals.items(), key=lambda x: x[1][0], reverse=True
+        ):
+            percentage = float(cat_total) / float(total) * 100.0 if total > 0 else 0.0
             categories.append(CategoryData(
                 category=cat,
-                total=data["total"],
-                count=data["count"],
+                total=cat_total,
+                count=cat_count,
                 percentage=round(percentage, 1)
             ))
 
         # Monthly data
-        monthly_totals: dict[str, dict] = defaultdict(lambda: {"total": Decimal("0"), "count": 0})
-        for expense in expenses:
-            month_key = expense.date.strftime("%Y-%m")
-            monthly_totals[month_key]["total"] += Decimal(str(expense.amount))
-            monthly_totals[month_key]["count"] += 1
-
         monthly_data = [
-            MonthlyData(month=month, total=data["total"], count=data["count"])
-            for month, data in sorted(monthly_totals.items())
+            MonthlyData(month=month, total=month_total, count=month_count)
+            for month, (month_total, month_count) in sorted(monthly_totals.items())
         ]
 
         # Daily data (last 30 days)
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        daily_totals: dict[str, dict] = defaultdict(lambda: {"total": Decimal("0"), "count": 0})
-        for expense in expenses:
-            if expense.date >= thirty_days_ago:
-                day_key = expense.date.strftime("%Y-%m-%d")
-                daily_totals[day_key]["total"] += Decimal(str(expense.amount))
-                daily_totals[day_key]["count"] += 1
+        thirty_days_ago = now - timedelta(days=30)
+        day_col = func.date(Expense.date, type_=Date)
+        daily_totals = {
+            expense_day.isoformat(): (day_total, day_count)
+            for expense_day, day_total, day_count in self.db.query(
+                day_col, func.sum(Expense.amount), func.count(Expense.id)
+            ).filter(
+                Expense.user_id == user_id,
+                Expense.date >= thirty_days_ago
+            ).group_by(day_col).all()
+        }
 
         # Fill in missing days with zeros
+        today = now.date()
         daily_data = []
-        for i in range(30):
-            day = (datetime.now() - timedelta(days=29-i)).strftime("%Y-%m-%d")
-            if day in daily_totals:
-                daily_data.append(DailyData(
-                    date=day,
-                    total=daily_totals[day]["total"],
-                    count=daily_totals[day]["count"]
-                ))
-            else:
-                daily_data.append(DailyData(date=day, total=Decimal("0"), count=0))
+        for days_ago in range(29, -1, -1):
+            day = (today - timedelta(days=days_ago)).isoformat()
+            day_total, day_count = daily_totals.get(day, _EMPTY_BUCKET)
+            daily_data.append(DailyData(date=day, total=day_total, count=day_count))
 
         # Month over month comparison
-        now = datetime.now()
-        current_month = now.strftime("%Y-%m")
-        previous_month = (now.replace(day=1) - timedelta(days=1)).strftime("%Y-%m")
+        current_month = today.isoformat()[:7]
+        previous_month = (today.replace(day=1) - timedelta(days=1)).isoformat()[:7]
         
-        current_month_total = monthly_totals.get(current_month, {"total": Decimal("0")})["total"]
-        previous_month_total = monthly_totals.get(previous_month, {"total": Decimal("0")})["total"]
+        current_month_total = monthly_totals.get(current_month, _EMPTY_BUCKET)[0]
+        previous_month_total = monthly_totals.get(previous_month, _EMPTY_BUCKET)[0]
         
         if previous_month_total > 0:
-            mom_change = ((current_month_total - previous_month_total) / previous_month_total * 100)
+            mom_change = (
+                float(current_month_total - previous_month_total) / float(previous_month_total) * 100.0
+            )
         else:
-            mom_change = Decimal("100") if current_month_total > 0 else Decimal("0")
+            mom_change = 100.0 if current_month_total > 0 else 0.0
 
         # Top category
         top_category = categories[0].category if categories else None
@@ -1,16 +1,49 @@
 """CSV Import service for bulk expense imports."""
 
 import csv
+import hashlib
 import io
+import threading
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
-from typing import List, Tuple, BinaryIO
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple, BinaryIO
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from app.core.cache import import_cache, response_cache
+from app.core.config import settings
 from app.models.expense import Expense
 from app.models.user import User
 from app.schemas.import_export import ImportResult, ImportError, ImportPreview, ImportRow
-from app.schemas.expense import SUPPORTED_CURRENCIES
+from app.schemas.expense import SUPPORTED_CURRENCIES, normalize_tags, round_to_cents
+
+
+# Rows per INSERT statement; keeps statement size bounded on large files
+IMPORT_BATCH_SIZE = 1000
+
+# Accepted import date formats, in precedence order
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y")
+
+# Thousands separators and currency symbols dropped from amounts in one pass
+_AMOUNT_STRIP = str.maketrans("", "", ",₹$€")
+
+
+class ParsedImport:
+    """Parsed CSV rows plus validate_row results for a prefix of them.
+
+    Instances are shared across requests through import_cache; lock serializes
+    validation so concurrent imports of one upload validate each row once.
+    """
+
+    __slots__ = ("lock", "parse_errors", "results", "rows")
+
+    def __init__(self, rows: List[dict], parse_errors: List[ImportError]):
+        self.rows = rows
+        self.parse_errors = parse_errors
+        self.results: List[Tuple[bool, str, dict]] = []
+        self.lock = threading.Lock()
 
 
 class ImportService:
@@ -25,11 +58,12 @@ class ImportService:
         errors = []
         
         try:
-            reader = csv.DictReader(io.StringIO(file_content))
+            reader = csv.reader(io.StringIO(file_content))
+            fieldnames = next(reader, None)
             
             # Check required headers
             required_headers = {"date", "category", "description", "amount"}
-            if not reader.fieldnames:
+            if not fieldnames:
                 errors.append(ImportError(
                     row_number=0,
                     error="No headers found in CSV file",
@@ -37,8 +71,9 @@ class ImportService:
                 ))
                 return rows, errors
             
-            headers = set(h.lower().strip() for h in reader.fieldnames)
-            missing = required_headers - headers
+            # Normalize header keys once instead of per row
+            keys = [h.lower().strip() for h in fieldnames]
+            missing = required_headers - set(keys)
             if missing:
                 errors.append(ImportError(
                     row_number=0,
@@ -47,9 +82,15 @@ class ImportService:
                 ))
                 return rows, errors
 
-            for row_num, row in enumerate(reader, start=2):
-                # Normalize keys
-                normalized = {k.lower().strip(): v.strip() if v else "" for k, v in row.items()}
+            padding = [""] * len(keys)
+            row_num = 1
+            for values in reader:
+                if not values:
+                    continue  # Blank lines are skipped, as csv.DictReader does
+                row_num += 1
+                if len(values) < len(keys):
+                    values += padding[len(values):]
+                normalized = dict(zip(keys, map(str.strip, values)))
                 normalized["row_number"] = row_num
                 rows.append(normalized)
                 
@@ -62,6 +103,22 @@ class ImportService:
         
         return rows, errors
 
+    def _parse_date(self, date_str: str) -> datetime:
+        """Parse an import date, trying zero-padded ISO in C before strptime formats."""
+        if len(date_str) == 10 and date_str[4] == "-" and date_str[7] == "-":
+            try:
+                return datetime.fromisoformat(date_str)
+            except ValueError:
+                pass
+
+        # Order matters: ambiguous dates like 05/01/2026 resolve to the first match
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(date_str, fmt)
+            except ValueError:
+                continue
+        raise ValueError(f"Invalid date format: {date_str}")
+
     def validate_row(self, row: dict) -> Tuple[bool, str, dict]:
         """Validate a single row and return (is_valid, error_message, cleaned_data)."""
         cleaned = {}
@@ -69,25 +126,19 @@ class ImportService:
         # Date validation
         date_str = row.get("date", "")
         try:
-            # Try multiple date formats
-            for fmt in ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y"]:
-                try:
-                    cleaned["date"] = datetime.strptime(date_str, fmt)
-                    break
-                except ValueError:
-                    continue
-            else:
-                return False, f"Invalid date format: {date_str}", {}
+            cleaned["date"] = self._parse_date(date_str)
+        except ValueError:
+            return False, f"Invalid date format: {date_str}", {}
         except Exception as e:
             return False, f"Date error: {str(e)}", {}
 
         # Amount validation
-        amount_str = row.get("amount", "").replace(",", "").replace("₹", "").replace("$", "").replace("€", "").strip()
+        amount_str = row.get("amount", "").translate(_AMOUNT_STRIP).strip()
         try:
             amount = Decimal(amount_str)
             if amount <= 0:
                 return False, "Amount must be positive", {}
-            cleaned["amount"] = round(amount, 2)
+            cleaned["amount"] = round_to_cents(amount)
         except (InvalidOperation, ValueError):
             return False, f"Invalid amount: {row.get('amount', '')}", {}
 
@@ -104,7 +155,9 @@ class ImportService:
         cleaned["description"] = description
 
         # Currency (optional)
-        currency = row.get("currency", "INR").upper().strip() or "INR"
+        # parse_csv already strips values; blank or absent columns skip upper()
+        currency = row.get("currency")
+        currency = currency.upper() if currency else "INR"
         if currency not in SUPPORTED_CURRENCIES:
             currency = "INR"
         cleaned["currency"] = currency
@@ -112,8 +165,7 @@ class ImportService:
         # Tags (optional)
         tags_str = row.get("tags", "")
         if tags_str:
-            tags = [t.strip().lower() for t in tags_str.split(",") if t.strip()][:10]
-            cleaned["tags"] = tags
+            cleaned["tags"] = normalize_tags(tags_str.split(","))
         else:
             cleaned["tags"] = []
 
@@ -126,24 +178,41 @@ class ImportService:
 
         return True, "", cleaned
 
+    def parse(self, user: User, file_content: str) -> ParsedImport:
+        """Parse CSV content, reusing the result for a recently seen upload."""
+        digest = hashlib.blake2b(file_content.encode(), digest_size=16).digest()
+        return import_cache.get_or_set(
+            user.id, ("import", digest), lambda: ParsedImport(*self.parse_csv(file_content)),
+            cacheable=lambda parsed: len(parsed.rows) <= settings.IMPORT_CACHE_MAX_ROWS
+        )
+
+    def validate_rows(self, parsed: ParsedImport, limit: Optional[int] = None) -> list:
+        """Return validate_row results for the first limit rows, validating only new ones."""
+        rows = parsed.rows if limit is None else parsed.rows[:limit]
+        with parsed.lock:
+            done = parsed.results
+            done.extend(self.validate_row(row) for row in rows[len(done):])
+            return done[:len(rows)]
+
     def preview_import(self, user: User, file_content: str) -> ImportPreview:
         """Preview import without committing."""
-        rows, parse_errors = self.parse_csv(file_content)
+        parsed = self.parse(user, file_content)
+        rows, parse_errors = parsed.rows, parsed.parse_errors
         
         preview_data = []
         validation_errors = []
         valid_count = 0
         total_amount = Decimal("0")
 
-        for row in rows[:100]:  # Preview max 100 rows
-            is_valid, error, cleaned = self.validate_row(row)
+        # Preview max 100 rows
+        for row, (is_valid, error, cleaned) in zip(rows, self.validate_rows(parsed, 100)):
             
             if is_valid:
                 valid_count += 1
                 total_amount += cleaned["amount"]
                 preview_data.append(ImportRow(
                     row_number=row["row_number"],
-                    date=cleaned["date"].strftime("%Y-%m-%d"),
+                    date=cleaned["date"].date().isoformat(),
                     category=cleaned["category"],
                     description=cleaned["description"],
                     amount=str(cleaned["amount"]),
@@ -169,9 +238,39 @@ class ImportService:
             estimated_total=total_amount
         )
 
+    def _iter_payload(
+        self, user_id: int, rows: List[dict], results: list, errors: List[ImportError]
+    ) -> Iterator[dict]:
+        """Yield INSERT parameters for valid rows, recording invalid ones in errors."""
+        for row, (is_valid, error, cleaned) in zip(rows, results):
+            if not is_valid:
+                errors.append(ImportError(
+                    row_number=row.get("row_number", 0),
+                    error=error,
+                    data=row
+                ))
+                continue
+
+            yield {
+                "user_id": user_id,
+                "amount": cleaned["amount"],
+                "category": cleaned["category"],
+                "description": cleaned["description"],
+                "date": cleaned["date"],
+                "currency": cleaned["currency"],
+                "tags": cleaned["tags"],
+                "notes": cleaned["notes"]
+            }
+
     def import_expenses(self, user: User, file_content: str) -> ImportResult:
-        """Import expenses from CSV."""
-        rows, parse_errors = self.parse_csv(file_content)
+        """
+        Import expenses from CSV.
+
+        Valid rows are committed together: a database error in any batch rolls
+        back the whole import and every row counts as failed.
+        """
+        parsed = self.parse(user, file_content)
+        rows, parse_errors = parsed.rows, parsed.parse_errors
         
         if parse_errors:
             return ImportResult(
@@ -182,47 +281,41 @@ class ImportService:
                 imported_ids=[]
             )
 
-        imported_ids = []
         validation_errors = []
+        payload = self._iter_payload(user.id, rows, self.validate_rows(parsed), validation_errors)
 
-        for row in rows:
-            is_valid, error, cleaned = self.validate_row(row)
-            
-            if not is_valid:
-                validation_errors.append(ImportError(
-                    row_number=row.get("row_number", 0),
-                    error=error,
-                    data=row
-                ))
-                continue
-
-            try:
-                expense = Expense(
-                    user_id=user.id,
-                    amount=cleaned["amount"],
-                    category=cleaned["category"],
-                    description=cleaned["description"],
-                    date=cleaned["date"],
-                    currency=cleaned["currency"],
-                    tags=cleaned["tags"],
-                    notes=cleaned["notes"]
-                )
-                self.db.add(expense)
-                self.db.flush()
-                imported_ids.append(expense.id)
-            except Exception as e:
-                validation_errors.append(ImportError(
-                    row_number=row.get("row_number", 0),
-                    error=f"Database error: {str(e)}",
-                    data=row
+        imported_ids = []
+        try:
+            # Bulk INSERT ... RETURNING in bounded batches, building each batch's
+            # payload only when it is sent
+            batch = list(islice(payload, IMPORT_BATCH_SIZE))
+            while batch:
+                imported_ids.extend(self.db.scalars(
+                    insert(Expense).returning(Expense.id, sort_by_parameter_order=True),
+                    batch
                 ))
+                batch = list(islice(payload, IMPORT_BATCH_SIZE))
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            imported_ids = []
+            for _ in payload:
+                pass  # Still collect errors for the rows after the failed batch
+            rolled_back = len(rows) - len(validation_errors)
+            validation_errors.append(ImportError(
+                row_number=0,
+                error=f"Database error, {rolled_back} valid rows not imported: {str(e)}",
+                data={}
+            ))
 
         if imported_ids:
             self.db.commit()
+            response_cache.invalidate(user.id)
+            import_cache.invalidate(user.id)
 
         return ImportResult(
             success_count=len(imported_ids),
-            error_count=len(validation_errors),
+            # Rows not imported, including valid ones rolled back with a failed batch
+            error_count=len(rows) - len(imported_ids),
             total_rows=len(rows),
             errors=validation_errors[:50],  # Limit errors in response
             imported_ids=imported_ids
@@ -1,11 +1,16 @@
 """Recurring expense service for business logic."""
 
-from datetime import datetime, date, timedelta
+from calendar import monthrange
+from collections import defaultdict
+from datetime import datetime, date, time, timedelta
 from decimal import Decimal
 from typing import Optional, List, Tuple
 from dateutil.relativedelta import relativedelta
+from sqlalchemy import JSON, insert, literal, select, update
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from app.core.cache import response_cache
 from app.models.recurring import RecurringExpense
 from app.models.expense import Expense
 from app.models.user import User
@@ -15,6 +20,39 @@ from app.schemas.recurring import (
 )
 
 
+def _next_daily(current_date: date, day_of_week, day_of_month, month_of_year) -> date:
+    return current_date + timedelta(days=1)
+
+
+def _next_weekly(current_date: date, day_of_week, day_of_month, month_of_year) -> date:
+    days_ahead = day_of_week - current_date.weekday()
+    if days_ahead <= 0:
+        days_ahead += 7
+    return current_date + timedelta(days=days_ahead)
+
+
+def _next_monthly(current_date: date, day_of_week, day_of_month, month_of_year) -> date:
+    next_month = current_date + relativedelta(months=1)
+    # Clamp to the month's real last day (e.g. 31 -> 30 in April, 29 in a leap February)
+    last_day = monthrange(next_month.year, next_month.month)[1]
+    return next_month.replace(day=min(day_of_month, last_day))
+
+
+def _next_yearly(current_date: date, day_of_week, day_of_month, month_of_year) -> date:
+    next_year = current_date.year + 1
+    last_day = monthrange(next_year, month_of_year)[1]
+    return date(next_year, month_of_year, min(day_of_month, last_day))
+
+
+# Unknown frequencies fall back to daily
+_NEXT_RUN_BY_FREQUENCY = {
+    "daily": _next_daily,
+    "weekly": _next_weekly,
+    "monthly": _next_monthly,
+    "yearly": _next_yearly,
+}
+
+
 class RecurringExpenseService:
     """Service class for recurring expense operations."""
 
@@ -23,10 +61,11 @@ class RecurringExpenseService:
 
     def get_by_id(self, recurring_id: int, user_id: int) -> Optional[RecurringExpense]:
         """Get recurring expense by ID for a specific user."""
-        return self.db.query(RecurringExpense).filter(
-            RecurringExpense.id == recurring_id,
-            RecurringExpense.user_id == user_id
-        ).first()
+        recurring = self.db.get(RecurringExpense, recurring_id)
+        # Another user's row is treated exactly like a missing one
+        if recurring is None or recurring.user_id != user_id:
+            return None
+        return recurring
 
     def calculate_next_run_date(
         self, 
@@ -37,32 +76,8 @@ class RecurringExpenseService:
         month_of_year: Optional[int] = None
     ) -> date:
         """Calculate the next run date based on frequency."""
-        if frequency == "daily":
-            return current_date + timedelta(days=1)
-        
-        elif frequency == "weekly":
-            days_ahead = day_of_week - current_date.weekday()
-            if days_ahead <= 0:
-                days_ahead += 7
-            return current_date + timedelta(days=days_ahead)
-        
-        elif frequency == "monthly":
-            next_month = current_date + relativedelta(months=1)
-            # Handle months with fewer days
-            day = min(day_of_month, 28) if next_month.month == 2 else min(day_of_month, 30)
-            try:
-                return next_month.replace(day=day)
-            except ValueError:
-                return next_month.replace(day=28)
-        
-        elif frequency == "yearly":
-            next_year = current_date.year + 1
-            try:
-                return date(next_year, month_of_year, day_of_month)
-            except ValueError:
-                return date(next_year, month_of_year, 28)
-        
-        return current_date + timedelta(days=1)
+        advance = _NEXT_RUN_BY_FREQUENCY.get(frequency, _next_daily)
+        return advance(current_date, day_of_week, day_of_month, month_of_year)
 
     def create(self, user: User, data: RecurringExpenseCreate) -> RecurringExpense:
         """Create a new recurring expense."""
@@ -127,47 +142,75 @@ class RecurringExpenseService:
     def process_due_recurring(self, user_id: int) -> ProcessedRecurringResult:
         """Process all due recurring expenses for a user and create actual expenses."""
         today = date.today()
-        due_recurring = self.db.query(RecurringExpense).filter(
+        due = (
             RecurringExpense.user_id == user_id,
             RecurringExpense.is_active == True,
             RecurringExpense.next_run_date <= today
-        ).all()
+        )
 
-        created_expenses = []
         errors = []
+        try:
+            # Templates past their end date are retired instead of run
+            self.db.execute(
+                update(RecurringExpense)
+                .where(*due, RecurringExpense.end_date < today)
+                .values(is_active=False)
+            )
 
-        for recurring in due_recurring:
-            try:
-                # Check if end_date has passed
-                if recurring.end_date and recurring.end_date < today:
-                    recurring.is_active = False
-                    continue
-
-                # Create the expense
-                expense = Expense(
-                    user_id=user_id,
-                    amount=recurring.amount,
-                    category=recurring.category,
-                    description=f"[Recurring] {recurring.description}",
-                    date=datetime.combine(today, datetime.min.time())
-                )
-                self.db.add(expense)
-                
-                # Update recurring expense
-                recurring.last_run_date = today
-                recurring.times_executed += 1
-                recurring.next_run_date = self.calculate_next_run_date(
-                    recurring.frequency, today,
-                    recurring.day_of_week, recurring.day_of_month, recurring.month_of_year
-                )
-                
-                self.db.flush()
-                created_expenses.append(expense.id)
-                
-            except Exception as e:
-                errors.append(f"Failed to process recurring {recurring.id}: {str(e)}")
-
-        self.db.commit()
+            # Next run dates follow each template's calendar rules, so only the
+            # schedule columns are loaded and templates sharing one are grouped
+            schedules = defaultdict(list)
+            for recurring_id, *schedule in self.db.execute(
+                select(
+                    RecurringExpense.id,
+                    RecurringExpense.frequency,
+                    RecurringExpense.day_of_week,
+                    RecurringExpense.day_of_month,
+                    RecurringExpense.month_of_year
+                ).where(*due)
+            ):
+                schedules[tuple(schedule)].append(recurring_id)
+
+            created_expenses = []
+            if schedules:
+                # Insert for exactly the templates the UPDATEs below advance; re-running
+                # the due filter could pick up a template that became due in between
+                due_ids = [recurring_id for ids in schedules.values() for recurring_id in ids]
+                created_expenses = sorted(self.db.scalars(
+                    insert(Expense).from_select(
+                        ["user_id", "amount", "category", "description", "date", "currency", "tags"],
+                        select(
+                            RecurringExpense.user_id,
+                            RecurringExpense.amount,
+                            RecurringExpense.category,
+                            literal("[Recurring] ") + RecurringExpense.description,
+                            literal(datetime.combine(today, time.min)),
+                            literal("INR"),
+                            literal([], JSON)
+                        ).where(RecurringExpense.id.in_(due_ids))
+                    ).returning(Expense.id)
+                ).all())
+
+                for schedule, ids in schedules.items():
+                    self.db.execute(
+                        update(RecurringExpense)
+                        .where(RecurringExpense.id.in_(ids))
+                        .values(
+                            last_run_date=today,
+                            times_executed=RecurringExpense.times_executed + 1,
+                            next_run_date=self.calculate_next_run_date(schedule[0], today, *schedule[1:])
+                        )
+                    )
+
+            self.db.commit()
+        except SQLAlchemyError as e:
+            # Creation and advancement are atomic: nothing is half-processed
+            self.db.rollback()
+            created_expenses = []
+            errors.append(f"Failed to process recurring expenses: {str(e)}")
+
+        if created_expenses:
+            response_cache.invalidate(user_id)
         
         return ProcessedRecurringResult(
             processed_count=len(created_expenses),
@@ -1,6 +1,7 @@
 """User service for business logic."""
 
 from typing import Optional
+from sqlalchemy import case, exists, func, or_, select
 from sqlalchemy.orm import Session
 
 from app.models.user import User
@@ -16,7 +17,8 @@ class UserService:
 
     def get_by_id(self, user_id: int) -> Optional[User]:
         """Get user by ID."""
-        return self.db.query(User).filter(User.id == user_id).first()
+        # Identity-map hit skips SQL entirely; a miss is a plain PK lookup
+        return self.db.get(User, user_id)
 
     def get_by_email(self, email: str) -> Optional[User]:
         """Get user by email."""
@@ -71,17 +73,36 @@ class UserService:
 
     def is_email_taken(self, email: str, exclude_user_id: Optional[int] = None) -> bool:
         """Check if email is already taken."""
-        query = self.db.query(User).filter(User.email == email.lower())
+        # Emails are stored lowercased, so the unique email index answers this
+        # and EXISTS stops at the first hit without loading a User
+        conditions = [User.email == email.lower()]
         if exclude_user_id:
-            query = query.filter(User.id != exclude_user_id)
-        return query.first() is not None
+            conditions.append(User.id != exclude_user_id)
+        return self.db.scalar(select(exists().where(*conditions)))
 
     def is_username_taken(self, username: str, exclude_user_id: Optional[int] = None) -> bool:
         """Check if username is already taken."""
-        query = self.db.query(User).filter(User.username == username.lower())
+        conditions = [User.username == username.lower()]
         if exclude_user_id:
-            query = query.filter(User.id != exclude_user_id)
-        return query.first() is not None
+            conditions.append(User.id != exclude_user_id)
+        return self.db.scalar(select(exists().where(*conditions)))
+
+    def exists_email_or_username(self, email: str, username: str) -> tuple[bool, bool]:
+        """Check email and username availability in a single query.
+
+        Returns ``(email_taken, username_taken)``.
+        """
+        email = email.lower()
+        username = username.lower()
+        # MAX over CASE is the portable spelling of bool_or (SQLite lacks it);
+        # both unique indexes serve the OR, so at most two rows are read
+        email_taken, username_taken = self.db.execute(
+            select(
+                func.coalesce(func.max(case((User.email == email, 1), else_=0)), 0),
+                func.coalesce(func.max(case((User.username == username, 1), else_=0)), 0),
+            ).where(or_(User.email == email, User.username == username))
+        ).one()
+        return bool(email_taken), bool(username_taken)
 
     def deactivate(self, user: User) -> User:
         """Deactivate user account."""
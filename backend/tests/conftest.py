@@ -1,16 +1,26 @@
 """Pytest fixtures for testing."""
 
+import os
+
+# Minimum bcrypt work factor for the suite; must be set before settings load
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# The suite runs in one process, so exercise the response cache and its invalidation
+os.environ.setdefault("RESPONSE_CACHE_TTL_SECONDS", "60")
+
 import pytest
-from typing import Generator
+from decimal import Decimal
+from typing import Callable, Generator
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, insert
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
 from app.database import Base, get_db
+from app.core.cache import import_cache, response_cache
 from app.models import User, Expense
 from app.core.security import get_password_hash, create_access_token
+from tests.constants import FIXED_NOW
 
 # Test database URL - in-memory SQLite
 TEST_DATABASE_URL = "sqlite:///:memory:"
@@ -20,23 +30,60 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Hashed once; every test user shares the same password
+TEST_PASSWORD_HASH = get_password_hash("Test123!")
+
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+# pysqlite issues its own BEGIN/COMMIT and breaks SAVEPOINT semantics, so hand
+# transaction control to SQLAlchemy
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema() -> Generator[None, None, None]:
+    """Create the schema once for the whole test session."""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
 
 
 @pytest.fixture(scope="function")
 def db() -> Generator[Session, None, None]:
-    """Create a fresh database for each test."""
-    Base.metadata.create_all(bind=engine)
-    session = TestingSessionLocal()
+    """Run each test inside a transaction that is rolled back afterwards."""
+    response_cache.clear()
+    import_cache.clear()
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Service-level commits only release a SAVEPOINT; the outer transaction
+    # is never committed
+    session = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
     try:
         yield session
     finally:
         session.close()
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(scope="session")
+def app_client() -> Generator[TestClient, None, None]:
+    """Start the app, lifespan included, once for the whole session."""
+    with TestClient(app) as test_client:
+        yield test_client
 
 
 @pytest.fixture(scope="function")
-def client(db: Session) -> Generator[TestClient, None, None]:
+def client(app_client: TestClient, db: Session) -> Generator[TestClient, None, None]:
     """Create a test client with database override."""
     def override_get_db():
         try:
@@ -45,9 +92,13 @@ def client(db: Session) -> Generator[TestClient, None, None]:
             pass
     
     app.dependency_overrides[get_db] = override_get_db
-    with TestClient(app) as test_client:
-        yield test_client
-    app.dependency_overrides.clear()
+    try:
+        yield app_client
+    finally:
+        app.dependency_overrides.clear()
+        # The client is shared, so per-test auth must not leak into the next test
+        app_client.headers.pop("Authorization", None)
+        app_client.cookies.clear()
 
 
 @pytest.fixture
@@ -56,7 +107,7 @@ def test_user(db: Session) -> User:
     user = User(
         email="test@example.com",
         username="testuser",
-        hashed_password=get_password_hash("Test123!"),
+        hashed_password=TEST_PASSWORD_HASH,
         full_name="Test User",
         is_active=True
     )
@@ -85,7 +136,7 @@ def second_user(db: Session) -> User:
     user = User(
         email="second@example.com",
         username="seconduser",
-        hashed_password=get_password_hash("Test123!"),
+        hashed_password=TEST_PASSWORD_HASH,
         full_name="Second User",
         is_active=True
     )
@@ -94,3 +145,29 @@ def second_user(db: Session) -> User:
     db.refresh(user)
     return user
 
+
+@pytest.fixture
+def make_expenses(db: Session) -> Callable[..., None]:
+    """Insert expenses for a user with a single executemany.
+
+    Field values that are callables receive the row index, e.g.
+    ``amount=lambda i: Decimal("10.00") * i``.
+    """
+    def _make(user: User, count: int, **fields) -> None:
+        defaults = {
+            "amount": Decimal("10.00"),
+            "category": "Test",
+            "description": lambda i: f"Expense {i}",
+            "date": FIXED_NOW,
+        }
+        defaults.update(fields)
+        db.execute(insert(Expense), [
+            {
+                "user_id": user.id,
+                **{key: value(i) if callable(value) else value for key, value in defaults.items()},
+            }
+            for i in range(count)
+        ])
+        db.commit()
+
+    return _make
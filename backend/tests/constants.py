@@ -0,0 +1,6 @@
+"""Shared constants for the test suite."""
+
+from datetime import datetime
+
+# Fixed timestamp for expenses whose date does not matter to the test
+FIXED_NOW = datetime(2026, 1, 31, 12, 0, 0)
@@ -1,10 +1,12 @@
 """Tests for authentication endpoints."""
 
 import pytest
+from datetime import timedelta
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
 from app.models import User
+from app.core.security import create_access_token, decode_token
 
 
 class TestRegister:
@@ -154,3 +156,23 @@ class TestTokenRefresh:
         
         assert response.status_code == 401
 
+
+
+class TestDecodeToken:
+    """Tests for JWT decoding and the decode cache."""
+
+    def test_decode_token_cached(self, test_user_token: str):
+        """Test that repeated decodes of a token reuse the cached payload."""
+        payload = decode_token(test_user_token)
+
+        assert payload is not None
+        assert payload["type"] == "access"
+        assert decode_token(test_user_token) is payload
+
+    def test_decode_token_expired(self, test_user: User):
+        """Test that expired tokens are rejected."""
+        token = create_access_token(
+            data={"sub": str(test_user.id)}, expires_delta=timedelta(seconds=-1)
+        )
+
+        assert decode_token(token) is None
@@ -0,0 +1,105 @@
+"""Tests for budget endpoints."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from fastapi.testclient import TestClient
+
+
+class TestBudgetCache:
+    """Tests for cached budget reads."""
+
+    def test_overview_reflects_new_expense(self, authenticated_client: TestClient):
+        """Test that the cached overview is invalidated when an expense is added."""
+        authenticated_client.post("/budgets", json={"category": "Food", "monthly_limit": 1000})
+
+        response = authenticated_client.get("/budgets/overview")
+        assert response.status_code == 200
+        assert Decimal(response.json()["total_spent"]) == Decimal("0")
+
+        authenticated_client.post("/expenses", json={
+            "amount": 250.00,
+            "category": "Food",
+            "description": "Groceries",
+            "date": datetime.now().isoformat()
+        })
+
+        response = authenticated_client.get("/budgets/overview")
+        assert Decimal(response.json()["total_spent"]) == Decimal("250.00")
+
+    def test_list_reflects_update_and_delete(self, authenticated_client: TestClient):
+        """Test that the cached budget list is invalidated on update and delete."""
+        budget_id = authenticated_client.post(
+            "/budgets", json={"category": "Food", "monthly_limit": 1000}
+        ).json()["id"]
+        assert len(authenticated_client.get("/budgets").json()) == 1
+
+        authenticated_client.patch(f"/budgets/{budget_id}", json={"monthly_limit": 500})
+        budgets = authenticated_client.get("/budgets").json()
+        assert Decimal(budgets[0]["monthly_limit"]) == Decimal("500")
+
+        authenticated_client.delete(f"/budgets/{budget_id}")
+        assert authenticated_client.get("/budgets").json() == []
+        assert authenticated_client.get(f"/budgets/{budget_id}").status_code == 404
+
+
+class TestBudgetOverview:
+    """Tests for the budget overview."""
+
+    def test_overview_spending_per_category(self, authenticated_client: TestClient):
+        """Test that each budget gets only its own category's spending this month."""
+        for category, limit in (("Food", 100), ("Transport", 1000), ("Rent", 500)):
+            authenticated_client.post("/budgets", json={"category": category, "monthly_limit": limit})
+
+        now = datetime.now()
+        last_month = now.replace(day=1) - timedelta(days=1)
+        for amount, category, when in (
+            (60, "Food", now),
+            (50, "Food", now),
+            (200, "Transport", now),
+            (900, "Transport", last_month),
+            (30, "Books", now),
+        ):
+            authenticated_client.post("/expenses", json={
+                "amount": amount,
+                "category": category,
+                "description": "Spend",
+                "date": when.isoformat()
+            })
+
+        overview = authenticated_client.get("/budgets/overview").json()
+        spending = {
+            status["budget"]["category"]: Decimal(status["current_spending"])
+            for status in overview["budgets"]
+        }
+
+        assert spending == {
+            "Food": Decimal("110"), "Transport": Decimal("200"), "Rent": Decimal("0")
+        }
+        assert Decimal(overview["total_spent"]) == Decimal("310")
+        assert overview["categories_over_budget"] == 1
+        assert [alert["category"] for alert in overview["alerts"]] == ["Food"]
+        percentages = {
+            status["budget"]["category"]: status["percentage_used"]
+            for status in overview["budgets"]
+        }
+        assert percentages == {"Food": 110.0, "Transport": 20.0, "Rent": 0.0}
+
+
+class TestCreateBudget:
+    """Tests for budget creation."""
+
+    def test_create_existing_category_updates_budget(self, authenticated_client: TestClient):
+        """Test that posting a budget for an existing category updates it in place."""
+        first = authenticated_client.post(
+            "/budgets", json={"category": "Food", "monthly_limit": 1000}
+        ).json()
+        second = authenticated_client.post(
+            "/budgets", json={"category": "Food", "monthly_limit": 600, "alert_threshold": 90}
+        )
+
+        assert second.status_code == 201
+        data = second.json()
+        assert data["id"] == first["id"]
+        assert Decimal(data["monthly_limit"]) == Decimal("600")
+        assert data["alert_threshold"] == 90
+        assert len(authenticated_client.get("/budgets").json()) == 1
@@ -1,12 +1,22 @@
 """Tests for expense endpoints."""
 
+import csv
+import io
+import threading
+import time
 import pytest
 from datetime import datetime, timedelta
 from decimal import Decimal
 from fastapi.testclient import TestClient
+from sqlalchemy import Insert
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models import User, Expense
+from app.services import import_service
+from app.services.import_service import ImportService, ParsedImport
+from tests.constants import FIXED_NOW
 
 
 class TestCreateExpense:
@@ -74,6 +84,10 @@ class TestCreateExpense:
         response = authenticated_client.post("/expenses", json=expense_data)
         
         assert response.status_code == 422
+        data = response.json()
+        assert data["detail"] == "Validation error"
+        assert data["errors"][0]["field"] == "body.amount"
+        assert data["errors"][0]["type"] == "greater_than"
 
 
 class TestListExpenses:
@@ -90,20 +104,10 @@ class TestListExpenses:
         assert Decimal(data["total"]) == Decimal("0")
 
     def test_list_expenses_with_data(
-        self, authenticated_client: TestClient, db: Session, test_user: User
+        self, authenticated_client: TestClient, test_user: User, make_expenses
     ):
         """Test listing expenses with data."""
-        # Create test expenses
-        for i in range(3):
-            expense = Expense(
-                user_id=test_user.id,
-                amount=Decimal("100.00") * (i + 1),
-                category="Test",
-                description=f"Expense {i}",
-                date=datetime.now()
-            )
-            db.add(expense)
-        db.commit()
+        make_expenses(test_user, 3, amount=lambda i: Decimal("100.00") * (i + 1))
         
         response = authenticated_client.get("/expenses")
         
@@ -122,14 +126,14 @@ class TestListExpenses:
             amount=Decimal("100.00"),
             category="Food",
             description="Food expense",
-            date=datetime.now()
+            date=FIXED_NOW
         )
         expense2 = Expense(
             user_id=test_user.id,
             amount=Decimal("200.00"),
             category="Transport",
             description="Transport expense",
-            date=datetime.now()
+            date=FIXED_NOW
         )
         db.add_all([expense1, expense2])
         db.commit()
@@ -145,20 +149,19 @@ class TestListExpenses:
         self, authenticated_client: TestClient, db: Session, test_user: User
     ):
         """Test sorting expenses by date."""
-        now = datetime.now()
         expense1 = Expense(
             user_id=test_user.id,
             amount=Decimal("100.00"),
             category="Test",
             description="Older",
-            date=now - timedelta(days=5)
+            date=FIXED_NOW - timedelta(days=5)
         )
         expense2 = Expense(
             user_id=test_user.id,
             amount=Decimal("200.00"),
             category="Test",
             description="Newer",
-            date=now
+            date=FIXED_NOW
         )
         db.add_all([expense1, expense2])
         db.commit()
@@ -171,20 +174,10 @@ class TestListExpenses:
         assert data["expenses"][1]["description"] == "Older"
 
     def test_list_expenses_pagination(
-        self, authenticated_client: TestClient, db: Session, test_user: User
+        self, authenticated_client: TestClient, test_user: User, make_expenses
     ):
         """Test expense pagination."""
-        # Create 15 expenses
-        for i in range(15):
-            expense = Expense(
-                user_id=test_user.id,
-                amount=Decimal("10.00"),
-                category="Test",
-                description=f"Expense {i}",
-                date=datetime.now()
-            )
-            db.add(expense)
-        db.commit()
+        make_expenses(test_user, 15)
         
         # Get first page
         response = authenticated_client.get("/expenses?page=1&page_size=10")
@@ -199,6 +192,53 @@ class TestListExpenses:
         data = response.json()
         assert len(data["expenses"]) == 5
 
+        # Past the last page totals still cover the whole filtered set
+        response = authenticated_client.get("/expenses?page=3&page_size=10")
+        data = response.json()
+        assert data["expenses"] == []
+        assert data["count"] == 15
+        assert Decimal(data["total"]) == Decimal("150.00")
+
+    def test_list_expenses_cursor_pagination(
+        self, authenticated_client: TestClient, test_user: User, make_expenses
+    ):
+        """Test that following next_cursor visits every expense exactly once."""
+        make_expenses(
+            test_user, 15,
+            amount=lambda i: Decimal("10.00") * (i % 3 + 1),
+            date=lambda i: datetime(2026, 1, 1) + timedelta(days=i % 4)
+        )
+
+        for sort in ("", "&sort=date_desc", "&sort=amount_asc"):
+            seen = []
+            response = authenticated_client.get(f"/expenses?page_size=4{sort}")
+            data = response.json()
+            seen.extend(data["expenses"])
+            while data["next_cursor"]:
+                response = authenticated_client.get(
+                    f"/expenses?page_size=4{sort}&cursor={data['next_cursor']}"
+                )
+                data = response.json()
+                seen.extend(data["expenses"])
+                assert data["count"] == 15
+                assert Decimal(data["total"]) == Decimal("300.00")
+
+            assert len({e["id"] for e in seen}) == 15
+            offset_ids = [
+                e["id"]
+                for page in (1, 2, 3, 4)
+                for e in authenticated_client.get(
+                    f"/expenses?page_size=4&page={page}{sort}"
+                ).json()["expenses"]
+            ]
+            assert [e["id"] for e in seen] == offset_ids
+
+    def test_list_expenses_invalid_cursor(self, authenticated_client: TestClient):
+        """Test that a malformed cursor is rejected."""
+        response = authenticated_client.get("/expenses?cursor=not-a-cursor&sort=amount_asc")
+
+        assert response.status_code == 400
+
     def test_list_expenses_user_isolation(
         self, authenticated_client: TestClient, db: Session, test_user: User, second_user: User
     ):
@@ -209,7 +249,7 @@ class TestListExpenses:
             amount=Decimal("100.00"),
             category="Test",
             description="Test user expense",
-            date=datetime.now()
+            date=FIXED_NOW
         )
         # Create expense for second_user
         expense2 = Expense(
@@ -217,7 +257,7 @@ class TestListExpenses:
             amount=Decimal("200.00"),
             category="Test",
             description="Second user expense",
-            date=datetime.now()
+            date=FIXED_NOW
         )
         db.add_all([expense1, expense2])
         db.commit()
@@ -241,7 +281,7 @@ class TestUpdateExpense:
             amount=Decimal("100.00"),
             category="Food",
             description="Original",
-            date=datetime.now()
+            date=FIXED_NOW
         )
         db.add(expense)
         db.commit()
@@ -279,7 +319,7 @@ class TestDeleteExpense:
             amount=Decimal("100.00"),
             category="Food",
             description="To delete",
-            date=datetime.now()
+            date=FIXED_NOW
         )
         db.add(expense)
         db.commit()
@@ -307,28 +347,27 @@ class TestExpenseSummary:
         self, authenticated_client: TestClient, db: Session, test_user: User
     ):
         """Test expense summary."""
-        now = datetime.now()
         expenses = [
             Expense(
                 user_id=test_user.id,
                 amount=Decimal("100.00"),
                 category="Food",
                 description="Food 1",
-                date=now
+                date=FIXED_NOW
             ),
             Expense(
                 user_id=test_user.id,
                 amount=Decimal("200.00"),
                 category="Food",
                 description="Food 2",
-                date=now
+                date=FIXED_NOW
             ),
             Expense(
                 user_id=test_user.id,
                 amount=Decimal("300.00"),
                 category="Transport",
                 description="Transport",
-                date=now
+                date=FIXED_NOW
             ),
         ]
         db.add_all(expenses)
@@ -336,11 +375,307 @@ class TestExpenseSummary:
         
         response = authenticated_client.get("/expenses/summary")
         
+        assert response.status_code == 200
+        assert response.json() == {
+            "total_expenses": "600.00",
+            "expense_count": 3,
+            "average_expense": "200.00",
+            "category_breakdown": {"Food": "300.00", "Transport": "300.00"},
+            "monthly_totals": {"2026-01": "600.00"},
+        }
+
+    def test_get_analytics(
+        self, authenticated_client: TestClient, db: Session, test_user: User
+    ):
+        """Test analytics totals and category breakdown."""
+        now = datetime.now()
+        db.add_all([
+            Expense(user_id=test_user.id, amount=Decimal("50.00"), category="Food",
+                    description="Food 1", date=now),
+            Expense(user_id=test_user.id, amount=Decimal("150.00"), category="Food",
+                    description="Food 2", date=now - timedelta(days=40)),
+            Expense(user_id=test_user.id, amount=Decimal("100.00"), category="Transport",
+                    description="Transport", date=now),
+        ])
+        db.commit()
+
+        response = authenticated_client.get("/expenses/analytics?months=3")
+
         assert response.status_code == 200
         data = response.json()
-        assert Decimal(data["total_expenses"]) == Decimal("600.00")
+        assert Decimal(data["total_expenses"]) == Decimal("300.00")
         assert data["expense_count"] == 3
-        assert Decimal(data["average_expense"]) == Decimal("200.00")
-        assert Decimal(data["category_breakdown"]["Food"]) == Decimal("300.00")
-        assert Decimal(data["category_breakdown"]["Transport"]) == Decimal("300.00")
+        assert Decimal(data["highest_expense"]) == Decimal("150.00")
+        assert Decimal(data["lowest_expense"]) == Decimal("50.00")
+        assert data["top_category"] == "Food"
+        assert data["categories"][0]["count"] == 2
+        assert data["categories"][0]["percentage"] == 66.7
+        assert Decimal(data["current_month_total"]) == Decimal("150.00")
+        assert sum(day["count"] for day in data["daily_data"]) == 2
+        today = data["daily_data"][-1]
+        assert today["date"] == now.strftime("%Y-%m-%d")
+        assert Decimal(today["total"]) == Decimal("150.00")
+        assert today["count"] == 2
+
+    def test_cached_reads_invalidated_on_write(self, authenticated_client: TestClient):
+        """Test that cached summary and categories reflect new expenses."""
+        assert authenticated_client.get("/expenses/summary").json()["expense_count"] == 0
+        assert authenticated_client.get("/expenses/categories").json() == []
+
+        authenticated_client.post("/expenses", json={
+            "amount": 25.00,
+            "category": "Books",
+            "description": "Novel",
+            "date": "2026-01-31T12:00:00Z",
+            "tags": ["reading"]
+        })
+
+        assert authenticated_client.get("/expenses/summary").json()["expense_count"] == 1
+        assert authenticated_client.get("/expenses/categories").json() == ["Books"]
+        assert authenticated_client.get("/expenses/tags/all").json() == ["reading"]
+
+class TestExportExpenses:
+    """Tests for CSV export."""
+
+    def test_export_streams_all_rows(
+        self, authenticated_client: TestClient, test_user: User, make_expenses
+    ):
+        """Test that export includes every matching expense."""
+        make_expenses(
+            test_user, 120,
+            amount=lambda i: Decimal("10.00") + i,
+            category=lambda i: "Food" if i % 2 == 0 else "Transport",
+            description=lambda i: f"Expense, {i}",
+            date=lambda i: datetime(2026, 1, 1) + timedelta(days=i)
+        )
+
+        response = authenticated_client.get("/expenses/export")
+
+        assert response.status_code == 200
+        lines = response.text.splitlines()
+        assert lines[0] == "Date,Category,Description,Amount"
+        assert len(lines) == 121
+        assert '"Expense, 0"' in response.text
+
+        response = authenticated_client.get("/expenses/export?category=Transport")
+        assert len(response.text.splitlines()) == 61
+
+    def test_export_quotes_like_csv_module(
+        self, authenticated_client: TestClient, db: Session, test_user: User
+    ):
+        """Test that hand-quoted rows parse back to the original fields."""
+        description = 'Said "hi",\nthen left'
+        db.add(Expense(
+            user_id=test_user.id,
+            amount=Decimal("12.50"),
+            category="Food",
+            description=description,
+            date=datetime(2026, 1, 15)
+        ))
+        db.commit()
+
+        response = authenticated_client.get("/expenses/export")
+
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows[1] == ["2026-01-15", "Food", description, "12.50"]
+
+    def test_export_gzip_negotiated(
+        self, authenticated_client: TestClient, db: Session, test_user: User
+    ):
+        """Test that export is gzipped only when the client accepts it."""
+        db.add(Expense(
+            user_id=test_user.id,
+            amount=Decimal("5.00"),
+            category="Food",
+            description="Snack",
+            date=datetime(2026, 1, 15)
+        ))
+        db.commit()
+
+        response = authenticated_client.get(
+            "/expenses/export", headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text.splitlines()[1] == "2026-01-15,Food,Snack,5.00"
+
+        response = authenticated_client.get(
+            "/expenses/export", headers={"Accept-Encoding": "identity"}
+        )
+        assert "content-encoding" not in response.headers
+        assert response.text.splitlines()[1] == "2026-01-15,Food,Snack,5.00"
+
+    def test_export_gzip_explicit_entry_beats_wildcard(self, authenticated_client: TestClient):
+        """Test that an explicit gzip quality takes precedence over the * wildcard."""
+        for accept_encoding, gzipped in (
+            ("*;q=1, gzip;q=0", False),
+            ("gzip;q=0, *", False),
+            ("identity, *;q=0.5", True),
+            ("*;q=0, gzip", True),
+        ):
+            response = authenticated_client.get(
+                "/expenses/export", headers={"Accept-Encoding": accept_encoding}
+            )
+            assert (response.headers.get("content-encoding") == "gzip") is gzipped, accept_encoding
+
+
+class TestImportExpenses:
+    """Tests for CSV import."""
+
+    def test_import_inserts_valid_rows(self, authenticated_client: TestClient):
+        """Test that valid rows are imported in order and invalid rows reported."""
+        content = (
+            "date,category,description,amount,tags\n"
+            "2026-01-05,Food,Lunch,\"1,200.50\",\"Work, Meals\"\n"
+            "05/01/2026,Transport,Taxi,300,\n"
+            "not-a-date,Food,Broken,10,\n"
+            "2026-01-07,Food,Dinner,-5,\n"
+        )
+
+        response = authenticated_client.post(
+            "/expenses/import",
+            files={"file": ("expenses.csv", content.encode(), "text/csv")}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success_count"] == 2
+        assert data["error_count"] == 2
+        assert [e["row_number"] for e in data["errors"]] == [4, 5]
+
+        first = authenticated_client.get(f"/expenses/{data['imported_ids'][0]}").json()
+        assert first["description"] == "Lunch"
+        assert Decimal(first["amount"]) == Decimal("1200.50")
+        assert first["tags"] == ["work", "meals"]
+        second = authenticated_client.get(f"/expenses/{data['imported_ids'][1]}").json()
+        assert second["date"].startswith("2026-01-05")
+
+    def test_import_reuses_preview_validation(
+        self, authenticated_client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test that importing a just-previewed file does not re-validate its rows."""
+        validated = []
+        original = ImportService.validate_row
+
+        def counting_validate_row(self, row):
+            validated.append(row["row_number"])
+            return original(self, row)
+
+        monkeypatch.setattr(ImportService, "validate_row", counting_validate_row)
+        files = {"file": (
+            "expenses.csv",
+            b"date,category,description,amount\n2026-01-05,Food,Lunch,10\n2026-01-06,Food,Tea,2\n",
+            "text/csv"
+        )}
+
+        preview = authenticated_client.post("/expenses/import/preview", files=files)
+        assert preview.json()["valid_rows"] == 2
+        result = authenticated_client.post("/expenses/import", files=files)
 
+        assert result.json()["success_count"] == 2
+        assert validated == [2, 3]
+
+    def test_concurrent_validation_runs_once(self, monkeypatch: pytest.MonkeyPatch):
+        """Test that two requests sharing a cached parse validate each row once."""
+        validated = []
+        original = ImportService.validate_row
+
+        def slow_validate_row(self, row):
+            validated.append(row["row_number"])
+            time.sleep(0.01)
+            return original(self, row)
+
+        monkeypatch.setattr(ImportService, "validate_row", slow_validate_row)
+        rows = [
+            {"row_number": n, "date": "2026-01-05", "category": "Food",
+             "description": "Lunch", "amount": "10"}
+            for n in range(2, 6)
+        ]
+        parsed = ParsedImport(rows, [])
+        service = ImportService(None)
+        threads = [
+            threading.Thread(target=service.validate_rows, args=(parsed,)) for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert validated == [2, 3, 4, 5]
+        assert all(is_valid for is_valid, _, _ in service.validate_rows(parsed))
+
+    def test_large_upload_not_cached(
+        self, authenticated_client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test that uploads over IMPORT_CACHE_MAX_ROWS are re-parsed, not kept in memory."""
+        monkeypatch.setattr(settings, "IMPORT_CACHE_MAX_ROWS", 1)
+        validated = []
+        original = ImportService.validate_row
+
+        def counting_validate_row(self, row):
+            validated.append(row["row_number"])
+            return original(self, row)
+
+        monkeypatch.setattr(ImportService, "validate_row", counting_validate_row)
+        files = {"file": (
+            "expenses.csv",
+            b"date,category,description,amount\n2026-01-05,Food,Lunch,10\n2026-01-06,Food,Tea,2\n",
+            "text/csv"
+        )}
+
+        authenticated_client.post("/expenses/import/preview", files=files)
+        result = authenticated_client.post("/expenses/import", files=files)
+
+        assert result.json()["success_count"] == 2
+        assert validated == [2, 3, 2, 3]
+
+    def test_import_spans_batches(
+        self, authenticated_client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test that rows split across INSERT batches keep their order and errors."""
+        monkeypatch.setattr(import_service, "IMPORT_BATCH_SIZE", 2)
+        lines = [f"2026-01-{day:02d},Food,Meal {day},{day}" for day in range(1, 6)]
+        lines.insert(2, "bad,Food,Broken,1")
+        content = "date,category,description,amount\n" + "\n".join(lines) + "\n"
+
+        response = authenticated_client.post(
+            "/expenses/import",
+            files={"file": ("expenses.csv", content.encode(), "text/csv")}
+        )
+
+        data = response.json()
+        assert data["success_count"] == 5
+        assert [e["row_number"] for e in data["errors"]] == [4]
+        last = authenticated_client.get(f"/expenses/{data['imported_ids'][-1]}").json()
+        assert last["description"] == "Meal 5"
+
+    def test_import_database_error_rolls_back_all_rows(
+        self, authenticated_client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test that a failed batch rolls back earlier batches and counts every row as failed."""
+        monkeypatch.setattr(import_service, "IMPORT_BATCH_SIZE", 2)
+        original_scalars = db.scalars
+        inserts = []
+
+        def failing_scalars(statement, *args, **kwargs):
+            if isinstance(statement, Insert):
+                inserts.append(statement)
+                if len(inserts) == 2:
+                    raise OperationalError(str(statement), {}, Exception("disk full"))
+            return original_scalars(statement, *args, **kwargs)
+
+        monkeypatch.setattr(db, "scalars", failing_scalars)
+        lines = [f"2026-01-{day:02d},Food,Meal {day},{day}" for day in range(1, 5)]
+        lines.append("bad,Food,Broken,1")
+        content = "date,category,description,amount\n" + "\n".join(lines) + "\n"
+
+        response = authenticated_client.post(
+            "/expenses/import",
+            files={"file": ("expenses.csv", content.encode(), "text/csv")}
+        )
+
+        data = response.json()
+        assert data["success_count"] == 0
+        assert data["error_count"] == data["total_rows"] == 5
+        assert [e["row_number"] for e in data["errors"]] == [6, 0]
+        assert "4 valid rows not imported" in data["errors"][1]["error"]
+        assert authenticated_client.get("/expenses").json()["count"] == 0
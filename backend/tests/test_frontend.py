@@ -1,75 +1,87 @@
 """Frontend integration tests - testing all pages and features."""
 
+import re
 import pytest
-from datetime import datetime
 from decimal import Decimal
 from fastapi.testclient import TestClient
+from httpx import Response
 from sqlalchemy.orm import Session
 
 from app.models import User, Expense
+from tests.constants import FIXED_NOW
+
+
+_ELEMENT_ID = re.compile(r'id="([^"]+)"')
+
+
+@pytest.fixture(scope="module")
+def home_page(app_client: TestClient) -> Response:
+    """Fetch the home page once for every test that inspects its HTML."""
+    return app_client.get("/")
+
+
+@pytest.fixture(scope="module")
+def home_ids(home_page: Response) -> set[str]:
+    """Every element id on the home page, collected in one regex pass."""
+    return set(_ELEMENT_ID.findall(home_page.text))
+
+
+@pytest.fixture(scope="module")
+def styles_css(app_client: TestClient) -> Response:
+    """Fetch the stylesheet once per module."""
+    return app_client.get("/static/styles.css")
+
+
+@pytest.fixture(scope="module")
+def app_js(app_client: TestClient) -> Response:
+    """Fetch the frontend script once per module."""
+    return app_client.get("/static/app.js")
 
 
 class TestFrontendPages:
     """Test that frontend pages load correctly."""
 
-    def test_home_page_loads(self, client: TestClient):
+    def test_home_page_loads(self, home_page: Response):
         """Test that the home page (login) loads."""
-        response = client.get("/")
-        assert response.status_code == 200
-        assert "Expense Tracker" in response.text
-        assert "Login" in response.text
-        assert "login-form" in response.text
+        assert home_page.status_code == 200
+        assert "Expense Tracker" in home_page.text
+        assert "Login" in home_page.text
+        assert "login-form" in home_page.text
 
-    def test_static_css_loads(self, client: TestClient):
+    def test_static_css_loads(self, styles_css: Response):
         """Test that CSS file loads."""
-        response = client.get("/static/styles.css")
-        assert response.status_code == 200
-        assert "text/css" in response.headers["content-type"]
-        assert ":root" in response.text
+        assert styles_css.status_code == 200
+        assert "text/css" in styles_css.headers["content-type"]
+        assert ":root" in styles_css.text
 
-    def test_static_js_loads(self, client: TestClient):
+    def test_static_js_loads(self, app_js: Response):
         """Test that JavaScript file loads."""
-        response = client.get("/static/app.js")
-        assert response.status_code == 200
-        assert "application/javascript" in response.headers["content-type"] or "text/javascript" in response.headers["content-type"]
-        assert "API_BASE_URL" in response.text
+        assert app_js.status_code == 200
+        assert "application/javascript" in app_js.headers["content-type"] or "text/javascript" in app_js.headers["content-type"]
+        assert "API_BASE_URL" in app_js.text
 
-    def test_register_form_elements_present(self, client: TestClient):
+    def test_register_form_elements_present(self, home_ids: set[str]):
         """Test that register form elements are in the HTML."""
-        response = client.get("/")
-        assert response.status_code == 200
-        assert 'id="register-form"' in response.text
-        assert 'id="register-email"' in response.text
-        assert 'id="register-username"' in response.text
-        assert 'id="register-password"' in response.text
+        expected = {"register-form", "register-email", "register-username", "register-password"}
+        assert expected - home_ids == set()
 
-    def test_main_app_elements_present(self, client: TestClient):
+    def test_main_app_elements_present(self, home_ids: set[str]):
         """Test that main app elements are in the HTML."""
-        response = client.get("/")
-        assert response.status_code == 200
-        # Summary section
-        assert 'id="summary-total"' in response.text
-        assert 'id="summary-month"' in response.text
-        assert 'id="summary-count"' in response.text
-        # Expense form
-        assert 'id="expense-form"' in response.text
-        assert 'id="amount"' in response.text
-        assert 'id="category"' in response.text
-        # Expense list
-        assert 'id="expenses-table"' in response.text
-        assert 'id="filter-category"' in response.text
-        # Pagination
-        assert 'id="pagination"' in response.text
-        assert 'id="prev-page"' in response.text
-        assert 'id="next-page"' in response.text
-
-    def test_delete_modal_present(self, client: TestClient):
+        expected = {
+            # Summary section
+            "summary-total", "summary-month", "summary-count",
+            # Expense form
+            "expense-form", "amount", "category",
+            # Expense list
+            "expenses-table", "filter-category",
+            # Pagination
+            "pagination", "prev-page", "next-page",
+        }
+        assert expected - home_ids == set()
+
+    def test_delete_modal_present(self, home_ids: set[str]):
         """Test that delete modal is in the HTML."""
-        response = client.get("/")
-        assert response.status_code == 200
-        assert 'id="delete-modal"' in response.text
-        assert 'id="cancel-delete"' in response.text
-        assert 'id="confirm-delete"' in response.text
+        assert {"delete-modal", "cancel-delete", "confirm-delete"} - home_ids == set()
 
 
 class TestAuthFlow:
@@ -145,20 +157,15 @@ class TestExpenseFlow:
         assert "total_pages" in data
 
     def test_list_expenses_with_data(
-        self, authenticated_client: TestClient, db: Session, test_user: User
+        self, authenticated_client: TestClient, test_user: User, make_expenses
     ):
         """Test listing expenses with data."""
-        # Create expenses
-        for i in range(5):
-            expense = Expense(
-                user_id=test_user.id,
-                amount=Decimal("100.00") * (i + 1),
-                category="Food & Dining" if i % 2 == 0 else "Shopping",
-                description=f"Test expense {i}",
-                date=datetime.now()
-            )
-            db.add(expense)
-        db.commit()
+        make_expenses(
+            test_user, 5,
+            amount=lambda i: Decimal("100.00") * (i + 1),
+            category=lambda i: "Food & Dining" if i % 2 == 0 else "Shopping",
+            description=lambda i: f"Test expense {i}"
+        )
 
         response = authenticated_client.get("/expenses")
         assert response.status_code == 200
@@ -176,14 +183,14 @@ class TestExpenseFlow:
             amount=Decimal("100.00"),
             category="Food & Dining",
             description="Food expense",
-            date=datetime.now()
+            date=FIXED_NOW
         )
         expense2 = Expense(
             user_id=test_user.id,
             amount=Decimal("200.00"),
             category="Shopping",
             description="Shopping expense",
-            date=datetime.now()
+            date=FIXED_NOW
         )
         db.add_all([expense1, expense2])
         db.commit()
@@ -204,14 +211,14 @@ class TestExpenseFlow:
             amount=Decimal("50.00"),
             category="Food",
             description="Cheap",
-            date=datetime.now()
+            date=FIXED_NOW
         )
         expense2 = Expense(
             user_id=test_user.id,
             amount=Decimal("500.00"),
             category="Food",
             description="Expensive",
-            date=datetime.now()
+            date=FIXED_NOW
         )
         db.add_all([expense1, expense2])
         db.commit()
@@ -231,7 +238,7 @@ class TestExpenseFlow:
             amount=Decimal("150.00"),
             category="Food",
             description="Test",
-            date=datetime.now()
+            date=FIXED_NOW
         )
         db.add(expense)
         db.commit()
@@ -254,7 +261,7 @@ class TestExpenseFlow:
             amount=Decimal("100.00"),
             category="Food",
             description="To delete",
-            date=datetime.now()
+            date=FIXED_NOW
         )
         db.add(expense)
         db.commit()
@@ -294,6 +301,27 @@ class TestHealthCheck:
         assert "app" in data
         assert "version" in data
 
+    def test_health_bypasses_middleware_stack(self, client: TestClient):
+        """Test that health probes are answered before request logging."""
+        response = client.get("/health")
+        assert response.headers["content-type"] == "application/json"
+        assert "X-Request-ID" not in response.headers
+
+    def test_request_id_header(self, client: TestClient):
+        """Test that every response carries a request ID."""
+        response = client.get("/")
+        assert response.status_code == 200
+        assert len(response.headers["X-Request-ID"]) == 8
+
+    def test_upstream_request_id_reused(self, client: TestClient):
+        """Test that a valid upstream request ID is propagated."""
+        response = client.get("/", headers={"X-Request-ID": "edge-abc123"})
+        assert response.headers["X-Request-ID"] == "edge-abc123"
+
+        response = client.get("/", headers={"X-Request-ID": "bad id\r\n"})
+        assert response.headers["X-Request-ID"] != "bad id"
+        assert len(response.headers["X-Request-ID"]) == 8
+
 
 class TestAPIDocumentation:
     """Test API documentation endpoints."""
@@ -310,3 +338,13 @@ class TestAPIDocumentation:
         assert response.status_code == 200
         assert "redoc" in response.text.lower()
 
+
+
+class TestCORS:
+    """Test CORS headers."""
+
+    def test_wildcard_origin_is_static(self, client: TestClient):
+        """Test that cross-origin requests get a static wildcard origin."""
+        response = client.get("/", headers={"Origin": "https://example.com"})
+        assert response.headers["access-control-allow-origin"] == "*"
+        assert "access-control-allow-credentials" not in response.headers
@@ -1,15 +1,22 @@
 """Tests for service layer."""
 
 import pytest
-from datetime import datetime
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
+from sqlalchemy import create_engine, event, inspect, update
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 
+from app.core.cache import ResponseCache
+from app.database import Base, create_tables
 from app.models import User, Expense
+from app.models.recurring import RecurringExpense
 from app.services.user_service import UserService
 from app.services.expense_service import ExpenseService
+from app.services.recurring_service import RecurringExpenseService
 from app.schemas.user import UserCreate, UserUpdate
 from app.schemas.expense import ExpenseCreate, ExpenseUpdate, ExpenseFilters
+from tests.constants import FIXED_NOW
 
 
 class TestUserService:
@@ -31,6 +38,9 @@ class TestUserService:
         assert user.email == "service@test.com"
         assert user.username == "servicetest"
         assert user.hashed_password != "Test123!"  # Password should be hashed
+        # Timestamps are naive UTC, whatever the server's local time zone
+        utc_now = datetime.now(timezone.utc).replace(tzinfo=None)
+        assert abs(user.created_at - utc_now) < timedelta(minutes=1)
 
     def test_authenticate_success(self, db: Session, test_user: User):
         """Test successful authentication."""
@@ -66,6 +76,22 @@ class TestUserService:
         assert service.is_email_taken("new@email.com") is False
         assert service.is_email_taken(test_user.email, test_user.id) is False
 
+    def test_is_username_taken(self, db: Session, test_user: User):
+        """Test username taken check."""
+        service = UserService(db)
+
+        assert service.is_username_taken(test_user.username.upper()) is True
+        assert service.is_username_taken("nobody") is False
+        assert service.is_username_taken(test_user.username, test_user.id) is False
+
+    def test_exists_email_or_username(self, db: Session, test_user: User):
+        """Test combined email/username taken check."""
+        service = UserService(db)
+
+        assert service.exists_email_or_username(test_user.email.upper(), "nobody") == (True, False)
+        assert service.exists_email_or_username("new@email.com", test_user.username) == (False, True)
+        assert service.exists_email_or_username("new@email.com", "nobody") == (False, False)
+
 
 class TestExpenseService:
     """Tests for ExpenseService."""
@@ -77,7 +103,7 @@ class TestExpenseService:
             amount=Decimal("100.50"),
             category="Food",
             description="Test expense",
-            date=datetime.now()
+            date=FIXED_NOW
         )
         
         expense = service.create(test_user, expense_data)
@@ -93,7 +119,7 @@ class TestExpenseService:
             amount=Decimal("100.50"),
             category="Food",
             description="Test expense",
-            date=datetime.now(),
+            date=FIXED_NOW,
             idempotency_key="test-key-123"
         )
         
@@ -102,6 +128,30 @@ class TestExpenseService:
         
         assert expense1.id == expense2.id
 
+    def test_idempotency_key_scoped_per_user(self, db: Session, test_user: User):
+        """Test that two users can reuse the same idempotency key."""
+        service = ExpenseService(db)
+        other_user = User(
+            email="other@example.com",
+            username="otheruser",
+            hashed_password=test_user.hashed_password
+        )
+        db.add(other_user)
+        db.commit()
+        expense_data = ExpenseCreate(
+            amount=Decimal("20.00"),
+            category="Food",
+            description="Shared key",
+            date=FIXED_NOW,
+            idempotency_key="shared-key"
+        )
+
+        expense1 = service.create(test_user, expense_data)
+        expense2 = service.create(other_user, expense_data)
+
+        assert expense1.id != expense2.id
+        assert expense2.user_id == other_user.id
+
     def test_update_expense(self, db: Session, test_user: User):
         """Test expense update."""
         service = ExpenseService(db)
@@ -112,15 +162,16 @@ class TestExpenseService:
             amount=Decimal("100.00"),
             category="Food",
             description="Original",
-            date=datetime.now()
+            date=FIXED_NOW
         )
         db.add(expense)
         db.commit()
         
         # Update expense
         update_data = ExpenseUpdate(amount=Decimal("150.00"))
-        updated = service.update(expense, update_data)
+        updated = service.update_by_id(expense.id, test_user.id, update_data)
         
+        assert service.update_by_id(expense.id, test_user.id + 1, update_data) is None
         assert updated.amount == Decimal("150.00")
         assert updated.description == "Original"  # Unchanged
 
@@ -133,13 +184,14 @@ class TestExpenseService:
             amount=Decimal("100.00"),
             category="Food",
             description="To delete",
-            date=datetime.now()
+            date=FIXED_NOW
         )
         db.add(expense)
         db.commit()
         expense_id = expense.id
         
-        result = service.delete(expense)
+        assert service.delete_by_id(expense_id, test_user.id + 1) is False
+        result = service.delete_by_id(expense_id, test_user.id)
         
         assert result is True
         assert service.get_by_id(expense_id, test_user.id) is None
@@ -168,12 +220,43 @@ class TestExpenseService:
         
         # Filter by category
         filters = ExpenseFilters(category="Food")
-        expenses, count, total = service.list_expenses(test_user.id, filters)
+        expenses, count, total, _ = service.list_expenses(test_user.id, filters)
         
         assert count == 1
         assert expenses[0].category == "Food"
         assert total == Decimal("100.00")
 
+    def test_list_expenses_single_statement(self, db: Session, test_user: User):
+        """Test that a page with tags loads in one statement, not one per row."""
+        service = ExpenseService(db)
+        db.add_all([
+            Expense(
+                user_id=test_user.id,
+                amount=Decimal("10.00"),
+                category="Food",
+                description=f"Meal {i}",
+                date=datetime(2026, 1, 1),
+                tags=["food", f"tag{i}"]
+            )
+            for i in range(30)
+        ])
+        db.commit()
+        user_id = test_user.id
+        db.expire_all()
+
+        statements = []
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.get_bind(), "before_cursor_execute", count)
+        try:
+            expenses, *_ = service.list_expenses(user_id, ExpenseFilters(page_size=20))
+            assert all(len(e.tags) == 2 for e in expenses)
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", count)
+
+        assert len(expenses) == 20
+        assert len(statements) == 1
+
     def test_get_summary(self, db: Session, test_user: User):
         """Test expense summary."""
         service = ExpenseService(db)
@@ -205,3 +288,176 @@ class TestExpenseService:
         assert "Food" in summary.category_breakdown
         assert "Transport" in summary.category_breakdown
 
+
+class TestResponseCache:
+    """Tests for the per-user response cache."""
+
+    def test_value_computed_across_invalidate_not_stored(self):
+        """Test that a read overlapping a write does not cache pre-write data."""
+        cache = ResponseCache(ttl=60)
+
+        def stale_read():
+            cache.invalidate(1)  # A write lands while the read is computing
+            return "before write"
+
+        assert cache.get_or_set(1, "summary", stale_read) == "before write"
+        assert cache.get_or_set(1, "summary", lambda: "after write") == "after write"
+        assert cache.get_or_set(1, "summary", lambda: "recomputed") == "after write"
+
+
+class TestSchemaUpgrades:
+    """Tests for create_tables() on databases from an older schema."""
+
+    def test_idempotency_index_upgraded(self):
+        """Test that a global idempotency index is replaced by the per-user one."""
+        old_engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(bind=old_engine)
+        with old_engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX uq_expenses_user_idempotency_key")
+            conn.exec_driver_sql(
+                "CREATE UNIQUE INDEX ix_expenses_idempotency_key ON expenses (idempotency_key)"
+            )
+
+        create_tables(bind=old_engine)
+        create_tables(bind=old_engine)  # Safe to run on every startup
+
+        indexes = {ix["name"] for ix in inspect(old_engine).get_indexes("expenses")}
+        assert "uq_expenses_user_idempotency_key" in indexes
+        assert "ix_expenses_idempotency_key" not in indexes
+
+        with Session(old_engine) as session:
+            users = [
+                User(email=f"u{i}@example.com", username=f"user{i}", hashed_password="x")
+                for i in range(2)
+            ]
+            session.add_all(users)
+            session.commit()
+            service = ExpenseService(session)
+            expense_data = ExpenseCreate(
+                amount=Decimal("5.00"),
+                category="Food",
+                description="Retry",
+                date=FIXED_NOW,
+                idempotency_key="upgraded-key"
+            )
+            first = service.create(users[0], expense_data)
+            assert service.create(users[0], expense_data).id == first.id
+            assert service.create(users[1], expense_data).id != first.id
+        old_engine.dispose()
+
+
+class TestRecurringExpenseService:
+    """Tests for RecurringExpenseService."""
+
+    def test_process_due_recurring(self, db: Session, test_user: User):
+        """Test that due templates create expenses and advance in one batch."""
+        service = RecurringExpenseService(db)
+        yesterday = date.today() - timedelta(days=1)
+
+        def template(description: str, **kwargs) -> RecurringExpense:
+            fields = dict(
+                user_id=test_user.id,
+                amount=Decimal("15.00"),
+                category="Subscriptions",
+                description=description,
+                frequency="daily",
+                start_date=yesterday,
+                next_run_date=yesterday
+            )
+            fields.update(kwargs)
+            return RecurringExpense(**fields)
+
+        db.add_all([
+            template("Streaming"),
+            template("Gym", frequency="weekly", day_of_week=0),
+            template("Expired", end_date=yesterday),
+            template("Later", next_run_date=date.today() + timedelta(days=3)),
+        ])
+        db.commit()
+
+        result = service.process_due_recurring(test_user.id)
+
+        assert result.processed_count == 2
+        assert result.errors == []
+        descriptions = {
+            e.description for e in db.query(Expense).filter(Expense.id.in_(result.created_expenses))
+        }
+        assert descriptions == {"[Recurring] Streaming", "[Recurring] Gym"}
+
+        by_name = {r.description: r for r in db.query(RecurringExpense)}
+        assert by_name["Streaming"].next_run_date == date.today() + timedelta(days=1)
+        assert by_name["Streaming"].times_executed == 1
+        assert by_name["Gym"].next_run_date.weekday() == 0
+        assert by_name["Expired"].is_active is False
+        assert by_name["Later"].times_executed == 0
+
+    def test_template_due_mid_run_is_left_for_next_run(
+        self, db: Session, test_user: User, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test that only the templates collected up front get expenses."""
+        service = RecurringExpenseService(db)
+        yesterday = date.today() - timedelta(days=1)
+        fields = dict(
+            user_id=test_user.id,
+            amount=Decimal("15.00"),
+            category="Subscriptions",
+            frequency="daily",
+            start_date=yesterday
+        )
+        db.add_all([
+            RecurringExpense(description="Due", next_run_date=yesterday, **fields),
+            RecurringExpense(description="Late", next_run_date=date.today() + timedelta(days=3), **fields),
+        ])
+        db.commit()
+
+        execute = db.execute
+
+        def execute_then_make_late_due(statement, *args, **kwargs):
+            result = execute(statement, *args, **kwargs)
+            if statement.is_select:
+                # Another writer makes "Late" due right after the schedules are read
+                rows = result.all()
+                execute(
+                    update(RecurringExpense)
+                    .where(RecurringExpense.description == "Late")
+                    .values(next_run_date=yesterday)
+                )
+                return rows
+            return result
+
+        user_id = test_user.id
+        monkeypatch.setattr(db, "execute", execute_then_make_late_due)
+        result = service.process_due_recurring(user_id)
+        monkeypatch.undo()
+
+        assert result.processed_count == 1
+        created = db.query(Expense).filter(Expense.id.in_(result.created_expenses)).one()
+        assert created.description == "[Recurring] Due"
+
+    def test_next_run_date_clamps_to_month_end(self, db: Session):
+        """Test monthly and yearly schedules land on the real last day."""
+        service = RecurringExpenseService(db)
+
+        assert service.calculate_next_run_date("monthly", date(2026, 12, 31), day_of_month=31) == date(2027, 1, 31)
+        assert service.calculate_next_run_date("monthly", date(2027, 3, 31), day_of_month=31) == date(2027, 4, 30)
+        assert service.calculate_next_run_date("monthly", date(2028, 1, 31), day_of_month=31) == date(2028, 2, 29)
+        assert service.calculate_next_run_date("yearly", date(2026, 4, 30), day_of_month=31, month_of_year=4) == date(2027, 4, 30)
+
+    def test_get_by_id_scoped_to_owner(self, db: Session, test_user: User, second_user: User):
+        """Test that another user's recurring expense is not returned."""
+        service = RecurringExpenseService(db)
+        recurring = RecurringExpense(
+            user_id=test_user.id,
+            amount=Decimal("15.00"),
+            category="Subscriptions",
+            description="Streaming",
+            frequency="daily",
+            start_date=date.today(),
+            next_run_date=date.today()
+        )
+        db.add(recurring)
+        db.commit()
+
+        assert service.get_by_id(recurring.id, test_user.id) is recurring
+        assert service.get_by_id(recurring.id, second_user.id) is None
+        assert service.get_by_id(recurring.id + 1, test_user.id) is None